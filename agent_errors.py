@@ -0,0 +1,20 @@
+"""
+Agent Errors - marker type for error text returned in place of a reply.
+=======================================================================
+The agents don't raise out of their generate/refine calls. On failure
+they return an explanatory string, or yield it as the last chunk of a
+stream, so every frontend can show it like any other reply.
+
+Wrapping that string in ErrorReply lets callers tell it apart from model
+output without sniffing its prefix. The prefix doesn't help once some
+chunks of a real reply have already gone out.
+"""
+
+
+class ErrorReply(str):
+    """Error text an agent returns or yields instead of model output.
+
+    Display it like any string, but don't cache it, save it to history or
+    refine from it.
+    """
+    __slots__ = ()
@@ -8,11 +8,60 @@ Run locally:  streamlit run app.py
 Deploy:       Push to GitHub → Render auto-deploys via render.yaml
 """
 
+import atexit
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import streamlit as st
 
+from agent_errors import ErrorReply
+
+# Chat window kept in session state: 80 messages = 40 turns. Older bubbles
+# add rerun cost without much value (the agents keep long-term context in
+# MemoryManager, not in this list).
+MAX_CHAT_MESSAGES = 80
+
+
+@dataclass(slots=True)
+class Msg:
+    """One chat bubble; slots keep per-message overhead to two references."""
+    role: str
+    content: str
+
+
+# ---------------------------------------------------------------------------
+# Static UI text (allocated once at import, not on every rerun)
+# ---------------------------------------------------------------------------
+_SIDEBAR_HELP = (
+    "**Cocktail Creator** — Design specialty cocktails with "
+    "full recipes, itemized costs, and menu pricing.\n\n"
+    "**Party Planner** — Create a 3-month seasonal event "
+    "strategy with themed cocktails."
+)
+
+_COCKTAIL_HINT = (
+    "Tell me what you'd like!  Examples:\n"
+    "- *4 tequila-based summer cocktails*\n"
+    "- *3 bourbon cocktails with a fall harvest theme*\n"
+    "- *a Mardi Gras cocktail menu*\n"
+    "- *2 refreshing gin drinks, citrus-forward*\n"
+    "- *surprise me with 5 creative cocktails*\n\n"
+    "I'll build full recipes with costs and pricing from our inventory."
+)
+
+_PARTY_HINT = (
+    "I'll generate a 3-month seasonal event plan for Patterson Park "
+    "Patio Bar with themed cocktails, decorations, music, and weekly "
+    "promotions.\n\n"
+    "Type **go** (or anything) to generate the initial plan, then give "
+    "feedback to refine it."
+)
+
 # ---------------------------------------------------------------------------
 # API key: Render env var first, local secrets_config fallback
+# (resolved once per session and kept in session state, so a missing key is
+# picked up as soon as it is set instead of being cached as None)
 # ---------------------------------------------------------------------------
 def _get_api_key():
     key = os.environ.get("GEMINI_API_KEY")
@@ -25,44 +74,95 @@ def _get_api_key():
         return None
 
 # ---------------------------------------------------------------------------
-# Lazy agent constructors (cached in session state so they survive reruns)
+# Lazy agent constructors: agents live in session state so they survive
+# reruns; the classes, Gemini client and MemoryManager they share are
+# process-wide st.cache_resource singletons
 # ---------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def _agent_classes():
+    """Import the agent modules (and google-genai with them) once per process."""
+    from memory_manager import MemoryManager
+    from party_planner import PartyPlanningAgent
+    from cocktail_agent import CocktailAgent
+    return MemoryManager, PartyPlanningAgent, CocktailAgent
+
+
+@st.cache_resource(show_spinner=False)
+def _gemini_client(api_key):
+    """One genai.Client (and its HTTP connection pool) per process."""
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+@st.cache_resource(show_spinner=False)
 def _get_memory_manager(api_key):
-    if "memory_manager" not in st.session_state:
-        from memory_manager import MemoryManager
-        st.session_state.memory_manager = MemoryManager(api_key)
-    return st.session_state.memory_manager
+    # MemoryManager holds no per-user state (just the shared bar_memory.json,
+    # its lock and a genai client), so one instance serves every session.
+    MemoryManager, _, _ = _agent_classes()
+    return MemoryManager(api_key, client=_gemini_client(api_key))
 
 
 def _get_party_agent(api_key):
     if "party_agent" not in st.session_state:
-        from party_planner import PartyPlanningAgent
+        _, PartyPlanningAgent, _ = _agent_classes()
         st.session_state.party_agent = PartyPlanningAgent(
             api_key,
             memory_manager=_get_memory_manager(api_key),
             calendar_events=[],  # Google sync disabled for web
+            client=_gemini_client(api_key),
         )
+        # Shared across sessions: only the first one actually uploads it
+        st.session_state.party_agent.create_prompt_cache()
     return st.session_state.party_agent
 
 
 def _get_cocktail_agent(api_key):
     if "cocktail_agent" not in st.session_state:
-        from cocktail_agent import CocktailAgent
+        _, _, CocktailAgent = _agent_classes()
         st.session_state.cocktail_agent = CocktailAgent(
             api_key,
             memory_manager=_get_memory_manager(api_key),
+            client=_gemini_client(api_key),
         )
+        # Shared across sessions: only the first one actually uploads it
+        st.session_state.cocktail_agent.create_prompt_cache()
     return st.session_state.cocktail_agent
 
 
+@st.cache_resource(show_spinner=False)
+def _persist_pool():
+    """Process-wide writer for history files, so the UI never waits on disk.
+
+    A single worker keeps writes to the shared *_history.jsonl files serialized
+    across all sessions.
+    """
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ppat-persist")
+    atexit.register(pool.shutdown, wait=True)
+    return pool
+
+
+def _new_history():
+    return deque(maxlen=MAX_CHAT_MESSAGES)
+
+
+def _reset_chat():
+    """Button callback: clear the conversation before the rerun it triggers,
+    so the first pass already renders the empty state (no st.rerun needed)."""
+    st.session_state.messages = _new_history()
+    st.session_state.party_plan = None
+    st.session_state.cocktail_result = None
+
+
 # ---------------------------------------------------------------------------
-# Page config
+# Page config (sent once per session; the browser keeps it across reruns)
 # ---------------------------------------------------------------------------
-st.set_page_config(
-    page_title="Patterson Park AI Assistant",
-    page_icon=":cocktail:",
-    layout="wide",
-)
+if "_page_configured" not in st.session_state:
+    st.set_page_config(
+        page_title="Patterson Park AI Assistant",
+        page_icon=":cocktail:",
+        layout="wide",
+    )
+    st.session_state._page_configured = True
 
 # ---------------------------------------------------------------------------
 # Sidebar
@@ -76,50 +176,44 @@ with st.sidebar:
     agent_choice = st.radio("Choose an agent", AGENTS, index=0)
 
     # Detect agent switch → reset conversation
-    if "agent_choice" not in st.session_state:
-        st.session_state.agent_choice = agent_choice
-    if agent_choice != st.session_state.agent_choice:
+    prev_choice = st.session_state.setdefault("agent_choice", agent_choice)
+    if agent_choice != prev_choice:
         st.session_state.agent_choice = agent_choice
-        st.session_state.messages = []
+        st.session_state.messages = _new_history()
         st.session_state.party_plan = None
         st.session_state.cocktail_result = None
 
     st.divider()
-    if st.button("New Conversation", use_container_width=True):
-        st.session_state.messages = []
-        st.session_state.party_plan = None
-        st.session_state.cocktail_result = None
-        st.rerun()
+    st.button("New Conversation", use_container_width=True, on_click=_reset_chat)
 
     st.divider()
-    st.markdown(
-        "**Cocktail Creator** — Design specialty cocktails with "
-        "full recipes, itemized costs, and menu pricing.\n\n"
-        "**Party Planner** — Create a 3-month seasonal event "
-        "strategy with themed cocktails."
-    )
+    st.markdown(_SIDEBAR_HELP)
 
 # ---------------------------------------------------------------------------
 # API key check
 # ---------------------------------------------------------------------------
-api_key = _get_api_key()
-if not api_key:
-    st.error(
-        "**Gemini API key not found.**  \n"
-        "Set the `GEMINI_API_KEY` environment variable (Render dashboard) "
-        "or create a local `secrets_config.py` with `GEMINI_API_KEY = '...'`."
-    )
-    st.stop()
+if "api_key" not in st.session_state:
+    key = _get_api_key()
+    if not key:
+        st.error(
+            "**Gemini API key not found.**  \n"
+            "Set the `GEMINI_API_KEY` environment variable (Render dashboard) "
+            "or create a local `secrets_config.py` with `GEMINI_API_KEY = '...'`."
+        )
+        st.stop()
+    st.session_state.api_key = key
+api_key = st.session_state.api_key
 
 # ---------------------------------------------------------------------------
 # Session-state defaults
 # ---------------------------------------------------------------------------
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "party_plan" not in st.session_state:
-    st.session_state.party_plan = None
-if "cocktail_result" not in st.session_state:
-    st.session_state.cocktail_result = None
+if "_initialized" not in st.session_state:
+    st.session_state.update({
+        "messages": _new_history(),
+        "party_plan": None,
+        "cocktail_result": None,
+        "_initialized": True,
+    })
 
 # ---------------------------------------------------------------------------
 # Header
@@ -130,65 +224,97 @@ st.header(f":cocktail: {agent_label}")
 # Show starter hint when conversation is empty
 if not st.session_state.messages:
     if agent_label == "Cocktail Creator":
-        st.info(
-            "Tell me what you'd like!  Examples:\n"
-            "- *4 tequila-based summer cocktails*\n"
-            "- *3 bourbon cocktails with a fall harvest theme*\n"
-            "- *a Mardi Gras cocktail menu*\n"
-            "- *2 refreshing gin drinks, citrus-forward*\n"
-            "- *surprise me with 5 creative cocktails*\n\n"
-            "I'll build full recipes with costs and pricing from our inventory."
-        )
+        st.info(_COCKTAIL_HINT)
     else:
-        st.info(
-            "I'll generate a 3-month seasonal event plan for Patterson Park "
-            "Patio Bar with themed cocktails, decorations, music, and weekly "
-            "promotions.\n\n"
-            "Type **go** (or anything) to generate the initial plan, then give "
-            "feedback to refine it."
-        )
+        st.info(_PARTY_HINT)
+
+def _record_stream(stream, received):
+    """Yield stream's chunks, keeping them in received (a list stored in
+    session state) so a later run can recover a reply cut off mid-stream."""
+    for chunk in stream:
+        received.append(chunk)
+        yield chunk
 
-# ---------------------------------------------------------------------------
-# Render chat history
-# ---------------------------------------------------------------------------
-for msg in st.session_state.messages:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
 
 # ---------------------------------------------------------------------------
-# Chat input
+# Chat panel (fragment: chat submits rerun only this region, not the sidebar)
 # ---------------------------------------------------------------------------
-if prompt := st.chat_input("Type your message..."):
-    # Show user message immediately
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
+@st.fragment
+def chat_panel(api_key, agent_label):
+    ss = st.session_state  # bind once; each proxy access takes the session lock
+    # A run appends the user message and its reply together, so a trailing
+    # user message means the run that owned it never finished: any rerun
+    # while a reply streams (the Stop button, another submit) abandons that
+    # run inside st.write_stream. Close the turn here with whatever text had
+    # arrived. Nothing is persisted or refined from a cut-off reply.
+    received = ss.pop("streaming_reply", None) or ()
+    if ss.messages and ss.messages[-1].role == "user":
+        partial = "".join(received)
+        stopped = f"{partial}\n\n*(stopped)*" if partial else "*(stopped)*"
+        ss.messages.append(Msg("assistant", stopped))
+
+    # Render chat history. Every bubble must be re-emitted on each run:
+    # Streamlit drops any element a run does not write, so rendering only
+    # the newest messages would blank out the rest of the conversation.
+    # The frontend diffs unchanged bubbles, so re-emitting them is cheap.
+    for msg in ss.messages:
+        with st.chat_message(msg.role):
+            st.markdown(msg.content)
 
-    # Generate response
-    with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            if agent_label == "Cocktail Creator":
+    # Chat input
+    if prompt := st.chat_input("Type your message..."):
+        # Show user message immediately. This is its only render in this run:
+        # the history loop above ran before chat_input returned the prompt,
+        # and only picks the message up on later runs.
+        ss.messages.append(Msg("user", prompt))
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        # Generate response (streamed token-by-token). st.write_stream renders
+        # the growing text as markdown in a single in-place element, buffers
+        # the chunks itself and returns the joined string — no manual +=.
+        with st.chat_message("assistant"):
+            status = st.status("Loading agent...", expanded=False)
+            is_cocktail = agent_label == "Cocktail Creator"
+            if is_cocktail:
                 agent = _get_cocktail_agent(api_key)
-                if st.session_state.cocktail_result:
-                    response = agent.refine_cocktails(
-                        st.session_state.cocktail_result, prompt
-                    )
+                status.update(label="Building prompt from memory & inventory...")
+                prev = ss.cocktail_result
+                if prev:
+                    stream = agent.refine_cocktails_stream(prev, prompt)
                 else:
-                    response = agent.generate_cocktails(prompt)
-                st.session_state.cocktail_result = response
-                agent.save_interaction(prompt, response)
-
+                    stream = agent.generate_cocktails_stream(prompt)
             else:  # Party Planner
                 agent = _get_party_agent(api_key)
-                if st.session_state.party_plan:
-                    response = agent.refine_plan(
-                        st.session_state.party_plan, prompt
-                    )
+                status.update(label="Building prompt from memory & inventory...")
+                prev = ss.party_plan
+                if prev:
+                    stream = agent.refine_plan_stream(prev, prompt)
+                else:
+                    stream = agent.generate_seasonal_plan_stream()
+
+            status.update(label="Generating...")
+            stop_slot = st.empty()
+            # Clicking reruns the fragment, which abandons this run mid-stream;
+            # the next run closes the turn from ss.streaming_reply (see top)
+            stop_slot.button("Stop", key="stop_generation")
+            ss.streaming_reply = received = []
+            response = st.write_stream(_record_stream(stream, received))
+            del ss.streaming_reply
+            stop_slot.empty()
+
+            if received and isinstance(received[-1], ErrorReply):
+                # Keep refining the last good plan / list; don't save the failure
+                status.update(label="Generation failed", state="error")
+            else:
+                if is_cocktail:
+                    ss.cocktail_result = response
                 else:
-                    response = agent.generate_seasonal_plan()
-                st.session_state.party_plan = response
-                agent.save_interaction(prompt, response)
+                    ss.party_plan = response
+                _persist_pool().submit(agent.save_interaction, prompt, response)
+                status.update(label="Done", state="complete")
+
+        ss.messages.append(Msg("assistant", response))
 
-            st.markdown(response)
 
-    st.session_state.messages.append({"role": "assistant", "content": response})
+chat_panel(api_key, agent_label)
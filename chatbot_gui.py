@@ -12,8 +12,15 @@ A collapsible debug console shows all behind-the-scenes activity.
 
 import tkinter as tk
 from tkinter import scrolledtext
+import asyncio
+import atexit
+import contextlib
 import threading
-import datetime
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import json
 import traceback
 
 # ---------------------------------------------------------------------------
@@ -24,10 +31,11 @@ try:
 except ImportError:
     secrets_config = None
 
-from party_planner import PartyPlanningAgent
-from daily_briefing import AIAssistant, sync_google_data
-from cocktail_agent import CocktailAgent
-from memory_manager import MemoryManager
+# The agent modules (party_planner, daily_briefing, cocktail_agent,
+# memory_manager) pull in google-genai / googleapiclient and are imported
+# on first use inside the _init_* coroutines, so the window paints first.
+from agent_errors import ErrorReply
+from response_cache import ResponseCache
 
 # ---------------------------------------------------------------------------
 # Colour / style constants
@@ -54,6 +62,57 @@ FONT_HEADER = ("Consolas", 14, "bold")
 FONT_DEBUG = ("Consolas", 9)
 FONT_DEBUG_BOLD = ("Consolas", 9, "bold")
 
+LOG_FLUSH_MS = 33  # debug console redraw interval (~30 Hz)
+MAX_CHAT_LINES = 5000  # scrollback kept in the chat pane
+MAX_DEBUG_LINES = 2000  # scrollback kept in the debug console
+MAX_DEFERRED_TRACEBACKS = 20  # tracebacks held while the console is hidden
+MAX_WORKER_THREADS = 4  # ceiling on concurrent blocking Google / Gemini calls
+
+# ---------------------------------------------------------------------------
+# Static chat messages
+# ---------------------------------------------------------------------------
+WELCOME_MSG = (
+    "Welcome to the Patterson Park Patio Bar AI Assistant!\n\n"
+    "Choose an agent above to get started:\n"
+    "  [Daily Briefing]   - Syncs Google Calendar & Gmail, then generates your Daily Battle Plan.\n"
+    "  [Party Planner]    - Creates and refines a 3-month seasonal event strategy.\n"
+    "  [Cocktail Creator] - Design specialty cocktails with full recipes, costs, and pricing.\n\n"
+    "Once an agent is active, type your messages below and they will be sent to the AI."
+)
+NO_API_KEY_MSG = (
+    "Error: GEMINI_API_KEY not found in secrets_config.py.\n"
+    "Add it and restart the app to enable the agents."
+)
+SELECT_AGENT_FIRST_MSG = "Please select an agent first (Daily Briefing, Party Planner, or Cocktail Creator)."
+BRIEFING_SELECT_MSG = (
+    "Daily Briefing agent selected.\n"
+    "Syncing Google accounts (calendar + email)... this may take a moment."
+)
+BRIEFING_READY_MSG = (
+    "Data synced. You can now ask follow-up questions about your schedule, "
+    "emails, or operations."
+)
+PARTY_SELECT_MSG = (
+    "Party Planner agent selected.\n"
+    "Generating your initial 3-month seasonal plan..."
+)
+PARTY_SYNC_MSG = "Syncing Google Calendar data..."
+PARTY_READY_MSG = "Initial plan ready. Type feedback to refine it, or ask questions."
+COCKTAIL_SELECT_MSG = (
+    "Cocktail Creator agent selected.\n"
+    "Loading liquor inventory and pricing data..."
+)
+COCKTAIL_READY_MSG = (
+    "Cocktail Creator ready!  Tell me what you'd like:\n\n"
+    "  Examples:\n"
+    "  - \"4 tequila-based summer cocktails\"\n"
+    "  - \"3 bourbon cocktails with a fall harvest theme\"\n"
+    "  - \"a Mardi Gras cocktail menu\"\n"
+    "  - \"2 refreshing gin drinks, citrus-forward\"\n"
+    "  - \"surprise me with 5 creative cocktails\"\n\n"
+    "I'll build full recipes with costs and pricing from our inventory."
+)
+
 
 class ChatbotGUI:
     def __init__(self, root):
@@ -66,28 +125,94 @@ class ChatbotGUI:
         # --- State ---
         self.current_agent = None  # "briefing", "party", or "cocktail"
         self.party_agent = None
-        self.party_plan = None  # latest plan text from party planner
+        self.party_plan = None  # latest plan from party planner, as split_plan_sections() list
         self.briefing_ai = None
         self.cocktail_agent = None
         self.cocktail_result = None  # latest cocktail list from cocktail agent
         self.calendar_events = None
         self.emails = None
+        self._google_synced_at = None  # time.time() of the last Google sync; see _cache_state
         self.loading = False
         self.debug_visible = True
 
+        # --- Pending debug-console lines, flushed in batches on the Tk thread ---
+        self._log_queue = deque()
+        self._log_lock = threading.Lock()
+        self._log_flush_scheduled = False
+        self._ts_cache = (0, "")  # (epoch second, "HH:MM:SS") for log timestamps
+        # Exceptions raised while the console is hidden; formatted on show
+        self._deferred_tracebacks = deque(maxlen=MAX_DEFERRED_TRACEBACKS)
+
+        # --- Background asyncio loop: all agent work runs as tasks on it ---
+        self._loop = asyncio.new_event_loop()
+        # asyncio.to_thread runs on the loop's default executor; bound it so
+        # spam-clicking agents can't fan out unlimited API calls
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS, thread_name_prefix="ppat")
+        self._loop.set_default_executor(self._executor)
+        atexit.register(self._executor.shutdown, wait=False)
+        threading.Thread(target=self._loop.run_forever, name="ppat-asyncio", daemon=True).start()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self._build_ui()
         self._show_welcome()
         self._log("APP", "Chatbot GUI initialised.")
         self._log("APP", f"secrets_config loaded: {secrets_config is not None}")
 
-        # --- Shared Memory Manager ---
-        api_key = secrets_config.GEMINI_API_KEY if secrets_config else None
-        if api_key:
-            self.memory_manager = MemoryManager(api_key, log_fn=self._log_safe)
+        # --- Gemini API key: resolved once; agents are unavailable without it ---
+        self._api_key = getattr(secrets_config, "GEMINI_API_KEY", None)
+        if self._api_key:
+            self._log("APP", "API key loaded (first 8 chars): " + self._api_key[:8] + "...", "ok")
+        else:
+            self._log("APP", "GEMINI_API_KEY not found in secrets_config.py", "err")
+            for btn in (self.btn_briefing, self.btn_party, self.btn_cocktail):
+                btn.configure(state=tk.DISABLED)
+            self._append_chat("SYSTEM", NO_API_KEY_MSG, "system")
+
+        # --- Shared Gemini client + Memory Manager ---
+        self._gemini_client = None  # built on first use — see gemini_client
+        self._client_lock = threading.Lock()
+        self._memory_manager = None  # built on first use — see memory_manager
+        self._memory_lock = threading.Lock()
+        if self._api_key:
+            # One worker serialises extractions; newest turn per agent wins
+            self._mem_pending = OrderedDict()  # source_agent -> (user_text, ai_response)
+            self._mem_wakeup = asyncio.Event()
+            self._run_async(self._memory_worker())
         else:
-            self.memory_manager = None
             self._log("MEMORY", "No API key — MemoryManager not available.", "warn")
 
+        # --- Exact-match reply cache (skips Gemini for repeated requests) ---
+        self.response_cache = ResponseCache(log_fn=self._log_safe)
+
+    @property
+    def gemini_client(self):
+        """One genai.Client (and its HTTP connection pool) shared by every
+        agent and the MemoryManager. None when there is no API key."""
+        if self._gemini_client is None and self._api_key:
+            with self._client_lock:
+                if self._gemini_client is None:
+                    from google import genai
+                    self._log_safe("GEMINI", "Initialising shared genai.Client...", "info")
+                    self._gemini_client = genai.Client(api_key=self._api_key)
+        return self._gemini_client
+
+    @property
+    def memory_manager(self):
+        """Shared MemoryManager, created (and its module imported) on first
+        access. None when there is no API key."""
+        if self._memory_manager is None and self._api_key:
+            with self._memory_lock:
+                if self._memory_manager is None:
+                    from memory_manager import MemoryManager
+                    self._memory_manager = MemoryManager(
+                        self._api_key, log_fn=self._log_safe, client=self.gemini_client
+                    )
+        return self._memory_manager
+
+    def _get_memory_manager(self):
+        """Callable form of the memory_manager property for asyncio.to_thread."""
+        return self.memory_manager
+
     # -----------------------------------------------------------------------
     # UI construction
     # -----------------------------------------------------------------------
@@ -125,13 +250,19 @@ class ChatbotGUI:
             command=self._select_cocktail
         )
         self.btn_cocktail.pack(side=tk.LEFT)
+        self._agent_btns = (
+            ("briefing", self.btn_briefing),
+            ("party", self.btn_party),
+            ("cocktail", self.btn_cocktail),
+        )
 
         # --- Input area (pack FIRST at BOTTOM so it is always visible) ---
         input_frame = tk.Frame(self.root, bg=BG_DARK, pady=8, padx=10)
         input_frame.pack(side=tk.BOTTOM, fill=tk.X)
 
+        self.entry_var = tk.StringVar()
         self.entry = tk.Entry(
-            input_frame, font=FONT_MAIN,
+            input_frame, font=FONT_MAIN, textvariable=self.entry_var,
             bg=ENTRY_BG, fg=FG_TEXT, insertbackground=FG_TEXT,
             relief=tk.FLAT, disabledbackground=ENTRY_BG
         )
@@ -155,8 +286,10 @@ class ChatbotGUI:
 
         # --- Chat display ---
         chat_frame = tk.Frame(self.pane, bg=BG_DARK)
+        # Read-only panes: no undo stack to grow with every insert
         self.chat_display = scrolledtext.ScrolledText(
             chat_frame, wrap=tk.WORD, state=tk.DISABLED,
+            undo=False, autoseparators=False, maxundo=0,
             bg=BG_CHAT, fg=FG_TEXT, font=FONT_MAIN,
             insertbackground=FG_TEXT, relief=tk.FLAT,
             padx=12, pady=10, spacing3=4
@@ -193,12 +326,19 @@ class ChatbotGUI:
         )
         clear_btn.pack(side=tk.RIGHT)
 
+        # Unwrapped (long lines / tracebacks scroll sideways), no undo stack
         self.debug_display = scrolledtext.ScrolledText(
-            debug_frame, wrap=tk.WORD, state=tk.DISABLED,
+            debug_frame, wrap=tk.NONE, state=tk.DISABLED,
+            undo=False, autoseparators=False, maxundo=0,
             bg=BG_DEBUG, fg=FG_DEBUG, font=FONT_DEBUG,
             insertbackground=FG_DEBUG, relief=tk.FLAT,
             padx=8, pady=6, spacing3=2, height=12
         )
+        self.debug_xscroll = tk.Scrollbar(
+            debug_frame, orient=tk.HORIZONTAL, command=self.debug_display.xview
+        )
+        self.debug_display.configure(xscrollcommand=self.debug_xscroll.set)
+        self.debug_xscroll.pack(side=tk.BOTTOM, fill=tk.X)
         self.debug_display.pack(fill=tk.BOTH, expand=True)
 
         # Tag styles for debug
@@ -211,6 +351,24 @@ class ChatbotGUI:
 
         self.pane.add(debug_frame, stretch="never", minsize=40)
 
+    # -----------------------------------------------------------------------
+    # Async plumbing
+    # -----------------------------------------------------------------------
+    def _run_async(self, coro):
+        """Schedule a coroutine on the background loop (callable from any thread).
+        Returns a concurrent.futures.Future that can be cancelled."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _on_close(self):
+        """Cancel outstanding agent tasks, stop the loop, and close the window."""
+        def _shutdown():
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.stop()
+        self._loop.call_soon_threadsafe(_shutdown)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     # -----------------------------------------------------------------------
     # Debug console helpers
     # -----------------------------------------------------------------------
@@ -218,250 +376,242 @@ class ChatbotGUI:
         """Append a timestamped line to the debug console.
         level: 'info' | 'ok' | 'warn' | 'err'
         Can be called from any thread via root.after."""
-        ts = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        now = time.time()
+        sec = int(now)
+        cached_sec, hms = self._ts_cache
+        if sec != cached_sec:
+            hms = time.strftime("%H:%M:%S", time.localtime(sec))
+            self._ts_cache = (sec, hms)  # single tuple swap: safe across threads
+        ts = f"{hms}.{int((now - sec) * 1000):03d}"
         tag = f"dbg_{level}" if f"dbg_{level}" in (
             "dbg_info", "dbg_ok", "dbg_warn", "dbg_err"
         ) else "dbg_default"
-        line = f"[{ts}] [{category}] {message}\n"
-
-        def _insert():
-            self.debug_display.configure(state=tk.NORMAL)
-            self.debug_display.insert(tk.END, f"[{ts}] ", "dbg_default")
-            self.debug_display.insert(tk.END, f"[{category}] ", "dbg_label")
-            self.debug_display.insert(tk.END, f"{message}\n", tag)
-            self.debug_display.configure(state=tk.DISABLED)
-            self.debug_display.see(tk.END)
+        with self._log_lock:
+            self._log_queue.append((ts, category, message, tag))
+            if self._log_flush_scheduled:
+                return
+            self._log_flush_scheduled = True
 
-        # Thread-safe: always schedule on main thread
+        # Thread-safe: one coalesced flush per frame on the main thread
         try:
-            self.root.after(0, _insert)
+            self.root.after(LOG_FLUSH_MS, self._flush_logs)
         except Exception:
             pass  # window may have been destroyed
 
+    def _flush_logs(self):
+        """Write every queued log line to the debug console in one insert."""
+        with self._log_lock:
+            pending = list(self._log_queue)
+            self._log_queue.clear()
+            self._log_flush_scheduled = False
+        if not pending:
+            return
+
+        chunks = []
+        for ts, category, message, tag in pending:
+            chunks += [f"[{ts}] ", "dbg_default", f"[{category}] ", "dbg_label", f"{message}\n", tag]
+        with self._editable(self.debug_display) as w:
+            w.insert(tk.END, *chunks)
+            self._trim_scrollback(w, MAX_DEBUG_LINES)
+            w.see(tk.END)
+
     def _log_safe(self, category, message, level="info"):
         """Alias that is always safe to call from background threads."""
         self._log(category, message, level)
 
+    def _log_traceback(self, category, level="err"):
+        """Log the current exception's traceback. Call from an except block.
+        While the console is hidden only a TracebackException is kept (it holds
+        no frames, so their locals can be freed); source lines are read and
+        formatted when the console is next shown."""
+        if self.debug_visible:
+            self._log(category, traceback.format_exc(), level)
+        else:
+            te = traceback.TracebackException(*sys.exc_info(), lookup_lines=False)
+            self._deferred_tracebacks.append((category, level, te))
+
     def _toggle_debug(self):
         """Show/hide the debug console text area."""
         self.debug_visible = not self.debug_visible
         if self.debug_visible:
+            self.debug_xscroll.pack(side=tk.BOTTOM, fill=tk.X)
             self.debug_display.pack(fill=tk.BOTH, expand=True)
             self.debug_toggle_btn.configure(text="Debug Console")
+            while self._deferred_tracebacks:
+                category, level, te = self._deferred_tracebacks.popleft()
+                self._log(category, "".join(te.format()), level)
         else:
             self.debug_display.pack_forget()
+            self.debug_xscroll.pack_forget()
             self.debug_toggle_btn.configure(text="Debug Console (hidden)")
 
     def _clear_debug(self):
-        self.debug_display.configure(state=tk.NORMAL)
-        self.debug_display.delete("1.0", tk.END)
-        self.debug_display.configure(state=tk.DISABLED)
+        with self._editable(self.debug_display) as w:
+            w.delete("1.0", tk.END)
 
     # -----------------------------------------------------------------------
     # Welcome / agent selection
     # -----------------------------------------------------------------------
     def _show_welcome(self):
-        self._append_chat(
-            "SYSTEM",
-            "Welcome to the Patterson Park Patio Bar AI Assistant!\n\n"
-            "Choose an agent above to get started:\n"
-            "  [Daily Briefing]   - Syncs Google Calendar & Gmail, then generates your Daily Battle Plan.\n"
-            "  [Party Planner]    - Creates and refines a 3-month seasonal event strategy.\n"
-            "  [Cocktail Creator] - Design specialty cocktails with full recipes, costs, and pricing.\n\n"
-            "Once an agent is active, type your messages below and they will be sent to the AI.",
-            "system"
-        )
+        self._append_chat("SYSTEM", WELCOME_MSG, "system")
 
     def _select_briefing(self):
-        if self.loading:
-            return
-        self.current_agent = "briefing"
-        self._update_btn_styles()
-        self._clear_chat()
-        self._log("AGENT", "User selected: Daily Briefing", "info")
-        self._append_chat(
-            "SYSTEM",
-            "Daily Briefing agent selected.\n"
-            "Syncing Google accounts (calendar + email)... this may take a moment.",
-            "system"
-        )
-        self._set_loading(True)
-        threading.Thread(target=self._init_briefing, daemon=True).start()
+        self._start_agent("briefing", "Daily Briefing", BRIEFING_SELECT_MSG, self._init_briefing)
 
     def _select_party(self):
-        if self.loading:
-            return
-        self.current_agent = "party"
-        self._update_btn_styles()
-        self._clear_chat()
-        self._log("AGENT", "User selected: Party Planner", "info")
-        self._append_chat(
-            "SYSTEM",
-            "Party Planner agent selected.\n"
-            "Generating your initial 3-month seasonal plan...",
-            "system"
-        )
-        self._set_loading(True)
-        threading.Thread(target=self._init_party, daemon=True).start()
+        self._start_agent("party", "Party Planner", PARTY_SELECT_MSG, self._init_party)
 
     def _select_cocktail(self):
+        self._start_agent("cocktail", "Cocktail Creator", COCKTAIL_SELECT_MSG, self._init_cocktail)
+
+    def _start_agent(self, agent, name, select_msg, init):
+        """Switch the chat to agent and schedule its _init_* coroutine."""
         if self.loading:
             return
-        self.current_agent = "cocktail"
+        if not self._api_key:
+            # The buttons are disabled without a key (see __init__); this
+            # keeps the _init_* coroutines free of the check
+            self._log("AGENT", "GEMINI_API_KEY missing — cannot start agent", "err")
+            return
+        self.current_agent = agent
         self._update_btn_styles()
         self._clear_chat()
-        self._log("AGENT", "User selected: Cocktail Creator", "info")
-        self._append_chat(
-            "SYSTEM",
-            "Cocktail Creator agent selected.\n"
-            "Loading liquor inventory and pricing data...",
-            "system"
-        )
+        self._log("AGENT", f"User selected: {name}", "info")
+        self._append_chat("SYSTEM", select_msg, "system")
         self._set_loading(True)
-        threading.Thread(target=self._init_cocktail, daemon=True).start()
+        self._run_async(init())
 
     def _update_btn_styles(self):
-        all_btns = {
-            "briefing": self.btn_briefing,
-            "party": self.btn_party,
-            "cocktail": self.btn_cocktail,
-        }
-        for key, btn in all_btns.items():
-            if key == self.current_agent:
-                btn.configure(bg=ACCENT, fg=BG_DARK)
-            else:
-                btn.configure(bg=BTN_BG, fg=FG_TEXT)
+        for key, btn in self._agent_btns:
+            active = key == self.current_agent
+            want_bg = ACCENT if active else BTN_BG
+            if btn.cget("bg") != want_bg:  # skip the Tcl call when unchanged
+                btn.configure(bg=want_bg, fg=BG_DARK if active else FG_TEXT)
 
     # -----------------------------------------------------------------------
-    # Agent initialisation (runs in background thread)
+    # Agent initialisation (coroutines on the background loop; blocking
+    # Google / Gemini calls are pushed to the loop's executor)
     # -----------------------------------------------------------------------
-    def _init_briefing(self):
+    async def _init_briefing(self):
         try:
-            api_key = secrets_config.GEMINI_API_KEY if secrets_config else None
-            if not api_key:
-                self._log("BRIEFING", "GEMINI_API_KEY not found in secrets_config.py", "err")
-                self.root.after(0, self._append_chat, "SYSTEM",
-                               "Error: GEMINI_API_KEY not found in secrets_config.py.", "system")
-                self.root.after(0, self._set_loading, False)
-                return
-
-            self._log("BRIEFING", "API key loaded (first 8 chars): " + api_key[:8] + "...", "ok")
+            api_key = self._api_key
+            from daily_briefing import AIAssistant, sync_google_data_async
+            memory_manager = await asyncio.to_thread(self._get_memory_manager)
 
             # --- Sync Google data ---
             self._log("GOOGLE", "Starting Google account sync...", "info")
             self._log("GOOGLE", f"Accounts to sync: {['bar', 'manager']}", "info")
 
-            calendar_events, emails = sync_google_data(log_fn=self._log_safe)
+            calendar_events, emails = await sync_google_data_async(log_fn=self._log_safe)
 
             self.calendar_events = calendar_events
             self.emails = emails
+            self._google_synced_at = time.time()
             self._log("GOOGLE", f"Sync complete: {len(calendar_events)} calendar events, {len(emails)} emails", "ok")
 
             # --- Create AI and generate ---
             self._log("GEMINI", "Creating AIAssistant instance...", "info")
-            self.briefing_ai = AIAssistant(api_key, log_fn=self._log_safe, memory_manager=self.memory_manager)
+            self.briefing_ai = await asyncio.to_thread(
+                AIAssistant,
+                api_key,
+                log_fn=self._log_safe,
+                memory_manager=memory_manager,
+                client=self.gemini_client,
+            )
 
-            self._log("GEMINI", "Calling generate_briefing() — no user message (initial run)", "info")
-            result = self.briefing_ai.generate_briefing(calendar_events, emails)
+            self._log("GEMINI", "Calling generate_briefing_stream() — no user message (initial run)", "info")
+            result = await asyncio.to_thread(
+                self._stream_to_chat,
+                "AI (Daily Briefing)",
+                lambda: self.briefing_ai.generate_briefing_stream(calendar_events, emails),
+            )
             self._log("GEMINI", f"Response received — {len(result)} chars", "ok")
 
-            self.root.after(0, self._append_chat, "AI (Daily Briefing)", result, "bot")
-            self.root.after(0, self._append_chat, "SYSTEM",
-                           "Data synced. You can now ask follow-up questions about your schedule, "
-                           "emails, or operations.", "system")
+            self.root.after(0, self._append_chat, "SYSTEM", BRIEFING_READY_MSG, "system")
         except Exception as e:
             self._log("BRIEFING", f"EXCEPTION: {e}", "err")
-            self._log("BRIEFING", traceback.format_exc(), "err")
+            self._log_traceback("BRIEFING", "err")
             self.root.after(0, self._append_chat, "SYSTEM", f"Error: {e}", "system")
         finally:
             self.root.after(0, self._set_loading, False)
 
-    def _init_party(self):
+    async def _init_party(self):
         try:
-            api_key = secrets_config.GEMINI_API_KEY if secrets_config else None
-            if not api_key:
-                self._log("PARTY", "GEMINI_API_KEY not found in secrets_config.py", "err")
-                self.root.after(0, self._append_chat, "SYSTEM",
-                               "Error: GEMINI_API_KEY not found in secrets_config.py.", "system")
-                self.root.after(0, self._set_loading, False)
-                return
-
-            self._log("PARTY", "API key loaded (first 8 chars): " + api_key[:8] + "...", "ok")
+            api_key = self._api_key
+            from party_planner import PartyPlanningAgent, split_plan_sections
+            memory_manager = await asyncio.to_thread(self._get_memory_manager)
 
             # --- Ensure Google Calendar data is available ---
             if not self.calendar_events:
                 self._log("GOOGLE", "No calendar data cached — syncing Google accounts for Party Planner...", "info")
-                self.root.after(0, self._append_chat, "SYSTEM",
-                               "Syncing Google Calendar data...", "system")
+                self.root.after(0, self._append_chat, "SYSTEM", PARTY_SYNC_MSG, "system")
                 try:
-                    calendar_events, emails = sync_google_data(log_fn=self._log_safe)
+                    from daily_briefing import sync_google_data_async
+                    calendar_events, emails = await sync_google_data_async(log_fn=self._log_safe)
                     self.calendar_events = calendar_events
                     self.emails = emails
+                    self._google_synced_at = time.time()
                     self._log("GOOGLE", f"Sync complete: {len(calendar_events)} calendar events, {len(emails)} emails", "ok")
                 except Exception as ge:
                     self._log("GOOGLE", f"Google sync failed (continuing without calendar): {ge}", "warn")
-                    self._log("GOOGLE", traceback.format_exc(), "warn")
+                    self._log_traceback("GOOGLE", "warn")
                     self.calendar_events = []
                     self.emails = []
+                    self._google_synced_at = time.time()
             else:
                 self._log("GOOGLE", f"Using cached calendar data: {len(self.calendar_events)} events", "ok")
 
             self._log("PARTY", "Creating PartyPlanningAgent...", "info")
-            self.party_agent = PartyPlanningAgent(
+            self.party_agent = await asyncio.to_thread(
+                PartyPlanningAgent,
                 api_key,
                 log_fn=self._log_safe,
-                memory_manager=self.memory_manager,
-                calendar_events=self.calendar_events
+                memory_manager=memory_manager,
+                calendar_events=self.calendar_events,
+                client=self.gemini_client,
             )
+            await asyncio.to_thread(self.party_agent.create_prompt_cache)
 
-            self._log("PARTY", "Calling generate_seasonal_plan()...", "info")
-            plan = self.party_agent.generate_seasonal_plan()
+            self._log("PARTY", "Calling generate_seasonal_plan_stream()...", "info")
+            plan = await asyncio.to_thread(
+                self._stream_to_chat, "AI (Party Planner)", self.party_agent.generate_seasonal_plan_stream
+            )
+            if isinstance(plan, ErrorReply):
+                # No plan to refine; the next message starts one from scratch
+                self._log("PARTY", "Initial plan failed — no plan kept", "err")
+                return
             self._log("PARTY", f"Initial plan received — {len(plan)} chars", "ok")
 
-            self.party_plan = plan
-            self.root.after(0, self._append_chat, "AI (Party Planner)", plan, "bot")
-            self.root.after(0, self._append_chat, "SYSTEM",
-                           "Initial plan ready. Type feedback to refine it, or ask questions.", "system")
+            self.party_plan = split_plan_sections(plan)
+            self.root.after(0, self._append_chat, "SYSTEM", PARTY_READY_MSG, "system")
         except Exception as e:
             self._log("PARTY", f"EXCEPTION: {e}", "err")
-            self._log("PARTY", traceback.format_exc(), "err")
+            self._log_traceback("PARTY", "err")
             self.root.after(0, self._append_chat, "SYSTEM", f"Error: {e}", "system")
         finally:
             self.root.after(0, self._set_loading, False)
 
-    def _init_cocktail(self):
+    async def _init_cocktail(self):
         try:
-            api_key = secrets_config.GEMINI_API_KEY if secrets_config else None
-            if not api_key:
-                self._log("COCKTAIL", "GEMINI_API_KEY not found in secrets_config.py", "err")
-                self.root.after(0, self._append_chat, "SYSTEM",
-                               "Error: GEMINI_API_KEY not found in secrets_config.py.", "system")
-                self.root.after(0, self._set_loading, False)
-                return
-
-            self._log("COCKTAIL", "API key loaded (first 8 chars): " + api_key[:8] + "...", "ok")
+            api_key = self._api_key
+            from cocktail_agent import CocktailAgent
+            memory_manager = await asyncio.to_thread(self._get_memory_manager)
             self._log("COCKTAIL", "Creating CocktailAgent...", "info")
-            self.cocktail_agent = CocktailAgent(
+            self.cocktail_agent = await asyncio.to_thread(
+                CocktailAgent,
                 api_key,
                 log_fn=self._log_safe,
-                memory_manager=self.memory_manager,
+                memory_manager=memory_manager,
+                client=self.gemini_client,
             )
             self.cocktail_result = None  # reset from any previous session
+            await asyncio.to_thread(self.cocktail_agent.create_prompt_cache)
 
             self._log("COCKTAIL", "Agent ready — waiting for user request.", "ok")
-            self.root.after(0, self._append_chat, "SYSTEM",
-                           "Cocktail Creator ready!  Tell me what you'd like:\n\n"
-                           "  Examples:\n"
-                           "  - \"4 tequila-based summer cocktails\"\n"
-                           "  - \"3 bourbon cocktails with a fall harvest theme\"\n"
-                           "  - \"a Mardi Gras cocktail menu\"\n"
-                           "  - \"2 refreshing gin drinks, citrus-forward\"\n"
-                           "  - \"surprise me with 5 creative cocktails\"\n\n"
-                           "I'll build full recipes with costs and pricing from our inventory.",
-                           "system")
+            self.root.after(0, self._append_chat, "SYSTEM", COCKTAIL_READY_MSG, "system")
         except Exception as e:
             self._log("COCKTAIL", f"EXCEPTION: {e}", "err")
-            self._log("COCKTAIL", traceback.format_exc(), "err")
+            self._log_traceback("COCKTAIL", "err")
             self.root.after(0, self._append_chat, "SYSTEM", f"Error: {e}", "system")
         finally:
             self.root.after(0, self._set_loading, False)
@@ -475,112 +625,215 @@ class ChatbotGUI:
     def _on_send(self):
         if self.loading:
             return
-        text = self.entry.get().strip()
+        text = self.entry_var.get().strip()
         if not text:
             return
         if not self.current_agent:
-            self._append_chat("SYSTEM", "Please select an agent first (Daily Briefing, Party Planner, or Cocktail Creator).", "system")
+            self._append_chat("SYSTEM", SELECT_AGENT_FIRST_MSG, "system")
             return
 
-        self.entry.delete(0, tk.END)
+        self.entry_var.set("")
         self._append_chat("You", text, "user")
         self._log("USER", f"Message sent to '{self.current_agent}': {text[:120]}{'...' if len(text) > 120 else ''}", "info")
         self._set_loading(True)
-        threading.Thread(target=self._process_message, args=(text,), daemon=True).start()
+        self._run_async(self._process_message(text))
 
-    def _process_message(self, user_text):
+    async def _process_message(self, user_text):
         response = None
         agent_name = None
+        display_names = {
+            "briefing": "AI (Daily Briefing)",
+            "party": "AI (Party Planner)",
+            "cocktail": "AI (Cocktail Creator)",
+        }
+        label = display_names.get(self.current_agent, "AI")
+        streamed = 0
+
+        def on_chunk(text):
+            """Called from the worker thread as each piece of the reply arrives."""
+            nonlocal streamed
+            streamed += len(text)
+            self.root.after(0, self._append_chat_chunk, text)
+
         try:
+            self.root.after(0, self._append_chat_header, label, "bot")
             if self.current_agent == "briefing":
                 self._log("GEMINI", "Routing to Daily Briefing agent...", "info")
-                response = self._handle_briefing_message(user_text)
+                response = await asyncio.to_thread(self._handle_briefing_message, user_text, on_chunk)
                 agent_name = "briefing"
             elif self.current_agent == "party":
                 self._log("GEMINI", "Routing to Party Planner agent...", "info")
-                response = self._handle_party_message(user_text)
+                response = await asyncio.to_thread(self._handle_party_message, user_text, on_chunk)
                 agent_name = "party_planner"
             elif self.current_agent == "cocktail":
                 self._log("GEMINI", "Routing to Cocktail Creator agent...", "info")
-                response = self._handle_cocktail_message(user_text)
+                response = await asyncio.to_thread(self._handle_cocktail_message, user_text, on_chunk)
                 agent_name = "cocktail_creator"
             else:
                 response = "No agent selected."
 
-            display_names = {
-                "briefing": "AI (Daily Briefing)",
-                "party": "AI (Party Planner)",
-                "cocktail": "AI (Cocktail Creator)",
-            }
-            label = display_names.get(self.current_agent, "AI")
-
+            # Replies that never went through the stream (e.g. "not initialised")
+            if not streamed:
+                self.root.after(0, self._append_chat_chunk, response)
+            self.root.after(0, self._append_chat_chunk, "\n")
             self._log("GEMINI", f"Response received — {len(response)} chars", "ok")
-            self.root.after(0, self._append_chat, label, response, "bot")
 
-            # Trigger memory extraction in background (non-blocking to UX)
-            if self.memory_manager and agent_name and response:
-                threading.Thread(
-                    target=self._extract_memory,
-                    args=(user_text, response, agent_name),
-                    daemon=True
-                ).start()
+            # Queue memory extraction for the background worker (non-blocking to UX)
+            if self.memory_manager and agent_name and response and not isinstance(response, ErrorReply):
+                self._queue_memory_extraction(user_text, response, agent_name)
 
         except Exception as e:
             self._log("CHAT", f"EXCEPTION: {e}", "err")
-            self._log("CHAT", traceback.format_exc(), "err")
+            self._log_traceback("CHAT", "err")
             self.root.after(0, self._append_chat, "SYSTEM", f"Error: {e}", "system")
         finally:
             self.root.after(0, self._set_loading, False)
 
-    def _handle_briefing_message(self, user_text):
-        """Send the user's message into the Daily Briefing LLM call."""
+    def _handle_briefing_message(self, user_text, on_chunk):
+        """Stream the user's message through the Daily Briefing LLM call."""
         if not self.briefing_ai:
             self._log("BRIEFING", "Agent not initialised — cannot process message", "err")
             return "Briefing agent not initialised. Please re-select Daily Briefing."
-        self._log("GEMINI", "Calling AIAssistant.chat() with user message...", "info")
-        return self.briefing_ai.chat(self.calendar_events, self.emails, user_text)
+        return self._cached_reply(
+            "briefing", user_text, self._cache_state(self.briefing_ai),
+            lambda: self.briefing_ai.chat_stream(self.calendar_events, self.emails, user_text),
+            "Calling AIAssistant.chat_stream() with user message...",
+            on_chunk,
+        )
 
-    def _handle_party_message(self, user_text):
-        """Send the user's message into the Party Planner LLM call."""
+    def _handle_party_message(self, user_text, on_chunk):
+        """Stream the user's message through the Party Planner LLM call."""
         if not self.party_agent:
             self._log("PARTY", "Agent not initialised — cannot process message", "err")
             return "Party Planner agent not initialised. Please re-select Party Planner."
+        from party_planner import split_plan_sections, join_plan_sections  # loaded by _init_party
         if self.party_plan:
-            self._log("GEMINI", f"Calling refine_plan() — current plan {len(self.party_plan)} chars + user feedback", "info")
-            result = self.party_agent.refine_plan(self.party_plan, user_text)
+            # Patch-style refine returns a JSON edit list, so the plan arrives
+            # whole (after a second, full rewrite call if the patch doesn't
+            # parse). A placeholder line goes out first so the pane isn't
+            # blank meanwhile; it is shown only, not part of the reply.
+            sections = self.party_plan
+
+            def refine_sections():
+                on_chunk("*Refining plan sections…*\n\n")
+                return [join_plan_sections(self.party_agent.refine_plan_sections(sections, user_text))]
+
+            result = self._cached_reply(
+                "party", user_text, self._cache_state(self.party_agent, sections),
+                refine_sections,
+                f"Calling refine_plan_sections() — {len(sections)} sections + user feedback",
+                on_chunk,
+            )
         else:
-            self._log("GEMINI", "Calling refine_plan() — no existing plan", "warn")
-            result = self.party_agent.refine_plan("(no plan yet)", user_text)
-        self.party_plan = result
+            result = self._cached_reply(
+                "party", user_text, self._cache_state(self.party_agent),
+                lambda: self.party_agent.refine_plan_stream("(no plan yet)", user_text),
+                "Calling refine_plan_stream() — no existing plan",
+                on_chunk,
+            )
+        if isinstance(result, ErrorReply):
+            return result  # keep the current plan; nothing to save
+        self.party_plan = split_plan_sections(result)
         self._log("PARTY", "Saving interaction to history...", "info")
         self.party_agent.save_interaction(user_text, result)
         self._log("PARTY", "History saved.", "ok")
         return result
 
-    def _handle_cocktail_message(self, user_text):
-        """Send the user's message into the Cocktail Creator LLM call."""
+    def _handle_cocktail_message(self, user_text, on_chunk):
+        """Stream the user's message through the Cocktail Creator LLM call."""
         if not self.cocktail_agent:
             self._log("COCKTAIL", "Agent not initialised — cannot process message", "err")
             return "Cocktail Creator agent not initialised. Please re-select Cocktail Creator."
-        if self.cocktail_result:
+        current = self.cocktail_result
+        if current:
             # We already have cocktails — this is refinement feedback
-            self._log("GEMINI", f"Calling refine_cocktails() — current list {len(self.cocktail_result)} chars + user feedback", "info")
-            result = self.cocktail_agent.refine_cocktails(self.cocktail_result, user_text)
+            result = self._cached_reply(
+                "cocktail", user_text, self._cache_state(self.cocktail_agent, current),
+                lambda: self.cocktail_agent.refine_cocktails_stream(current, user_text),
+                f"Calling refine_cocktails_stream() — current list {len(current)} chars + user feedback",
+                on_chunk,
+            )
         else:
             # First request — generate from scratch
-            self._log("GEMINI", "Calling generate_cocktails() with user request...", "info")
-            result = self.cocktail_agent.generate_cocktails(user_text)
+            result = self._cached_reply(
+                "cocktail", user_text, self._cache_state(self.cocktail_agent),
+                lambda: self.cocktail_agent.generate_cocktails_stream(user_text),
+                "Calling generate_cocktails_stream() with user request...",
+                on_chunk,
+            )
+        if isinstance(result, ErrorReply):
+            return result  # keep the current list; nothing to save
         self.cocktail_result = result
         self._log("COCKTAIL", "Saving interaction to history...", "info")
         self.cocktail_agent.save_interaction(user_text, result)
         self._log("COCKTAIL", "History saved.", "ok")
         return result
 
-    def _extract_memory(self, user_text, ai_response, source_agent):
-        """Run memory extraction in a background thread. Non-blocking to UX."""
+    def _stream_to_chat(self, label, make_stream):
+        """Worker-thread helper: post a chat entry and fill it as the stream
+        produces text. Returns the full reply, as an ErrorReply if the stream
+        ended in one."""
+        self.root.after(0, self._append_chat_header, label, "bot")
+        parts = []
+        for text in make_stream():
+            parts.append(text)
+            self.root.after(0, self._append_chat_chunk, text)
+        self.root.after(0, self._append_chat_chunk, "\n")
+        result = "".join(parts)
+        return ErrorReply(result) if parts and isinstance(parts[-1], ErrorReply) else result
+
+    def _cache_state(self, agent, *state):
+        """Response-cache state for a call: the conversation state plus
+        fingerprints of the context the agent folds into its prompts (shared
+        memory, the liquor inventory's file stamp, the last Google sync), so a
+        reply cached before any of those changed isn't served after."""
+        memory = agent.memory_manager.get_memory_context() if agent.memory_manager else ""
+        return json.dumps([*state, memory, getattr(agent, "inventory_stamp", None), self._google_synced_at])
+
+    def _cached_reply(self, agent, user_text, state, call, call_msg, on_chunk):
+        """Reply for (agent, user_text, state) from the cache, or by streaming
+        call()'s chunks through on_chunk and caching the joined text. A call
+        that ends in an ErrorReply isn't cached and comes back as one."""
+        key = ResponseCache.make_key(agent, user_text, state)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            self._log("CACHE", f"Cache hit for '{agent}' — skipping Gemini call.", "ok")
+            on_chunk(cached)
+            return cached
+        self._log("GEMINI", call_msg, "info")
+        response_buf = []
+        for chunk in call():
+            response_buf.append(chunk)
+            on_chunk(chunk)
+        result = "".join(response_buf)
+        if response_buf and isinstance(response_buf[-1], ErrorReply):
+            return ErrorReply(result)
+        self.response_cache.set(key, result)
+        return result
+
+    def _queue_memory_extraction(self, user_text, ai_response, source_agent):
+        """Hand a turn to the memory worker (call on the loop). A turn still
+        waiting for the same agent is replaced rather than queued behind."""
+        if self._mem_pending.pop(source_agent, None) is not None:
+            self._log("MEMORY", f"Dropped stale pending extraction ({source_agent}).", "info")
+        self._mem_pending[source_agent] = (user_text, ai_response)
+        self._mem_wakeup.set()
+
+    async def _memory_worker(self):
+        """Single long-lived task: runs extractions one at a time, so at most
+        one extraction request is in flight against the API."""
+        while True:
+            await self._mem_wakeup.wait()
+            self._mem_wakeup.clear()
+            while self._mem_pending:
+                source_agent, (user_text, ai_response) = self._mem_pending.popitem(last=False)
+                await self._extract_memory(user_text, ai_response, source_agent)
+
+    async def _extract_memory(self, user_text, ai_response, source_agent):
+        """Run one memory extraction off the loop. Non-blocking to UX."""
         try:
             self._log("MEMORY", f"Background extraction starting ({source_agent})...", "info")
-            self.memory_manager.extract_and_store(user_text, ai_response, source_agent)
+            await asyncio.to_thread(self.memory_manager.extract_and_store, user_text, ai_response, source_agent)
             self._log("MEMORY", "Background extraction complete.", "ok")
         except Exception as e:
             self._log("MEMORY", f"Extraction error (non-fatal): {e}", "warn")
@@ -588,17 +841,45 @@ class ChatbotGUI:
     # -----------------------------------------------------------------------
     # Chat display helpers
     # -----------------------------------------------------------------------
+    @staticmethod
+    @contextlib.contextmanager
+    def _editable(widget):
+        """Hold a read-only Text widget in NORMAL state for a batch of edits."""
+        widget.configure(state=tk.NORMAL)
+        try:
+            yield widget
+        finally:
+            widget.configure(state=tk.DISABLED)
+
     def _append_chat(self, sender, message, tag="bot"):
-        self.chat_display.configure(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"\n{sender}:\n", tag)
-        self.chat_display.insert(tk.END, f"{message}\n", tag if tag == "system" else "")
-        self.chat_display.configure(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        with self._editable(self.chat_display) as w:
+            w.insert(tk.END, f"\n{sender}:\n", tag, f"{message}\n", tag if tag == "system" else "")
+            self._trim_scrollback(w, MAX_CHAT_LINES)
+            w.see(tk.END)
+
+    def _append_chat_header(self, sender, tag="bot"):
+        """Start a new chat entry whose body arrives via _append_chat_chunk."""
+        with self._editable(self.chat_display) as w:
+            w.insert(tk.END, f"\n{sender}:\n", tag)
+            w.see(tk.END)
+
+    def _append_chat_chunk(self, text):
+        """Append streamed reply text to the current chat entry."""
+        with self._editable(self.chat_display) as w:
+            w.insert(tk.END, text)
+            self._trim_scrollback(w, MAX_CHAT_LINES)
+            w.see(tk.END)
+
+    @staticmethod
+    def _trim_scrollback(widget, max_lines):
+        """Drop the oldest lines so widget holds at most max_lines (widget must be NORMAL)."""
+        lines = int(widget.index("end-1c").split(".")[0])
+        if lines > max_lines:
+            widget.delete("1.0", f"{lines - max_lines + 1}.0")
 
     def _clear_chat(self):
-        self.chat_display.configure(state=tk.NORMAL)
-        self.chat_display.delete("1.0", tk.END)
-        self.chat_display.configure(state=tk.DISABLED)
+        with self._editable(self.chat_display) as w:
+            w.delete("1.0", tk.END)
 
     def _set_loading(self, state):
         self.loading = state
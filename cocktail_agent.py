@@ -14,106 +14,29 @@ Accepts an optional log_fn(category, message, level) callback for the GUI
 debug console.
 """
 
-import csv
 import datetime
 import json
 from pathlib import Path
 from google import genai
 from google.genai import types
 
+from agent_errors import ErrorReply
+from inventory import LIQUEUR_NAMES, inventory_stamp, load_liquor_inventory
+from model_hedge import hedged_generate
+from prompt_cache import PROMPT_CACHE_TTL_SECONDS, PromptCache
+
 try:
     import secrets_config
 except ImportError:
     secrets_config = None
 
-PRICES_CSV = Path(__file__).parent / "context_data" / "liquor_prices.csv"
-HISTORY_FILE = Path(__file__).parent / "cocktail_history.json"
-
-
-def _noop_log(category, message, level="info"):
-    pass
-
-
-class CocktailAgent:
-    def __init__(self, api_key, log_fn=None, memory_manager=None):
-        self.log = log_fn or _noop_log
-        self.memory_manager = memory_manager
-        self.log("COCKTAIL", "Initialising genai.Client...", "info")
-        self.client = genai.Client(api_key=api_key)
-        self.log("COCKTAIL", "genai.Client ready.", "ok")
-        self.liquor_inventory = self._load_liquor_inventory()
-        self.history = self._load_history()
-
-    # ------------------------------------------------------------------
-    # Inventory
-    # ------------------------------------------------------------------
-    def _load_liquor_inventory(self):
-        """Load liquor names and per-ounce costs from liquor_prices.csv."""
-        if not PRICES_CSV.exists():
-            self.log("INVENTORY", f"Prices file not found: {PRICES_CSV}", "warn")
-            return {}
-
-        self.log("INVENTORY", f"Loading liquor inventory from {PRICES_CSV}...", "info")
-        try:
-            inventory = {}
-            with open(PRICES_CSV, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    name = row["name"].strip()
-                    price = round(float(row["unit_price"]), 2)
-                    inventory[name] = price
-            self.log("INVENTORY", f"Loaded {len(inventory)} liquor items with pricing.", "ok")
-            return inventory
-        except Exception as e:
-            self.log("INVENTORY", f"Error loading inventory: {e}", "warn")
-            return {}
-
-    # ------------------------------------------------------------------
-    # Prompt context
-    # ------------------------------------------------------------------
-    def _get_inventory_context(self):
-        """Build the categorised inventory + pricing rules block for prompts."""
-        if not self.liquor_inventory:
-            return ""
-
-        well, mid_tier, premium, liqueurs = [], [], [], []
+HISTORY_FILE = Path(__file__).parent / "cocktail_history.jsonl"  # one JSON entry per line
+LEGACY_HISTORY_FILE = Path(__file__).parent / "cocktail_history.json"
+MAX_BATCH_REQUESTS = 8  # answer quality drops if too many requests share one prompt
 
-        liqueur_names = {
-            "aperol", "campari", "st-germain", "kahlua l",
-            "grand marnier", "licor 43", "luxardo", "absente",
-            "amaro nonino", "fernet branca", "chila orchata",
-            "tuaca", "jagermeister", "goldschlager", "fireball",
-            "rumpleminze", "skrewball", "emmet's irish cream",
-            "lillet", "dolin sweet vermouth", "vermouth dry noily prat",
-            "william price coffee liqueur", "william price limoncello",
-        }
-
-        for name, cost_oz in sorted(self.liquor_inventory.items()):
-            entry = f"  {name}: ${cost_oz:.2f}/oz"
-            lower = name.lower()
-            if lower.startswith("well ") or lower.startswith("(well)"):
-                well.append(entry)
-            elif "liqueur" in lower or lower in liqueur_names:
-                liqueurs.append(entry)
-            elif cost_oz >= 1.50:
-                premium.append(entry)
-            else:
-                mid_tier.append(entry)
+_INVENTORY_HEADER = "\n--- LIQUOR INVENTORY & COST PER OUNCE (from Patterson Inventory) ---"
 
-        lines = [
-            "\n--- LIQUOR INVENTORY & COST PER OUNCE (from Patterson Inventory) ---",
-            "\nWELL LIQUORS (avoid for specialty cocktails):",
-        ]
-        lines.extend(well)
-        lines.append("\nMID-TIER LIQUORS (preferred — a step up from well):")
-        lines.extend(mid_tier)
-        lines.append("\nPREMIUM LIQUORS (use sparingly, for feature cocktails only):")
-        lines.extend(premium)
-        lines.append("\nLIQUEURS & SPECIALTY SPIRITS:")
-        lines.extend(liqueurs)
-        lines.append("\n--- END INVENTORY ---")
-
-        lines.append("""
+_PRICING_RULES = """
 --- COCKTAIL PRICING RULES (MANDATORY) ---
 You MUST follow ALL of these rules for every cocktail you create:
 
@@ -153,8 +76,95 @@ You MUST follow ALL of these rules for every cocktail you create:
 6. Every cocktail MUST list specific oz measurements, specific ingredient names,
    itemized per-ingredient costs, a summed Total COGS, and the final Menu Price.
 --- END PRICING RULES ---
-""")
-        return "\n".join(lines)
+"""
+
+ROLE_TEXT = """You are the head bartender and cocktail director at Patterson Park Patio Bar
+in Houston, Texas.  Our clientele is 23-39 year olds who appreciate creative,
+well-crafted cocktails."""
+
+
+def _noop_log(category, message, level="info"):
+    pass
+
+
+class CocktailAgent:
+    _context_memo = None  # (inventory dict, built context) shared across instances
+
+    def __init__(self, api_key, log_fn=None, memory_manager=None, client=None):
+        self.log = log_fn or _noop_log
+        self.memory_manager = memory_manager
+        if client is not None:
+            self.client = client
+            self.log("COCKTAIL", "Using shared genai.Client.", "ok")
+        else:
+            self.log("COCKTAIL", "Initialising genai.Client...", "info")
+            self.client = genai.Client(api_key=api_key)
+            self.log("COCKTAIL", "genai.Client ready.", "ok")
+        self.liquor_inventory = self._load_liquor_inventory()
+        self.inventory_stamp = inventory_stamp()  # fingerprint of liquor_inventory for cache keys
+        # Inventory doesn't change during a session — build the prompt block once
+        self._inventory_context = self._build_inventory_context()
+        self.history = self._load_history()
+        self._prompt_cache = None  # PromptCache once create_prompt_cache() succeeds
+
+    # ------------------------------------------------------------------
+    # Inventory
+    # ------------------------------------------------------------------
+    def _load_liquor_inventory(self):
+        """Load liquor names and per-ounce costs from liquor_prices.csv."""
+        return load_liquor_inventory(log_fn=self.log)
+
+    # ------------------------------------------------------------------
+    # Prompt context
+    # ------------------------------------------------------------------
+    def _get_inventory_context(self):
+        """Return the categorised inventory + pricing rules block for prompts."""
+        return self._inventory_context
+
+    def _build_inventory_context(self):
+        """Build the categorised inventory + pricing rules block.
+
+        Agents loading the same (cached) inventory dict share one build via
+        the class-level _context_memo.
+        """
+        if not self.liquor_inventory:
+            return ""
+        memo = CocktailAgent._context_memo
+        if memo is not None and memo[0] is self.liquor_inventory:
+            return memo[1]
+
+        well, mid_tier, premium, liqueurs = [], [], [], []
+        add_well, add_mid, add_premium, add_liqueur = (
+            well.append, mid_tier.append, premium.append, liqueurs.append
+        )
+
+        # One pass over the sorted items; mid-tier (the common case) falls through
+        for name, cost_oz in self.liquor_inventory.items():
+            entry = f"  {name}: ${cost_oz:.2f}/oz"
+            lower = name.lower()
+            if lower.startswith(("well ", "(well)")):
+                add_well(entry)
+            elif lower in LIQUEUR_NAMES or "liqueur" in lower:
+                add_liqueur(entry)
+            elif cost_oz >= 1.50:
+                add_premium(entry)
+            else:
+                add_mid(entry)
+
+        lines = [_INVENTORY_HEADER, "\nWELL LIQUORS (avoid for specialty cocktails):"]
+        lines.extend(well)
+        lines.append("\nMID-TIER LIQUORS (preferred — a step up from well):")
+        lines.extend(mid_tier)
+        lines.append("\nPREMIUM LIQUORS (use sparingly, for feature cocktails only):")
+        lines.extend(premium)
+        lines.append("\nLIQUEURS & SPECIALTY SPIRITS:")
+        lines.extend(liqueurs)
+        lines.append("\n--- END INVENTORY ---")
+
+        lines.append(_PRICING_RULES)
+        context = "\n".join(lines)
+        CocktailAgent._context_memo = (self.liquor_inventory, context)
+        return context
 
     def _get_memory_context(self):
         if self.memory_manager:
@@ -166,25 +176,47 @@ You MUST follow ALL of these rules for every cocktail you create:
     # History
     # ------------------------------------------------------------------
     def _load_history(self):
+        if not HISTORY_FILE.exists() and LEGACY_HISTORY_FILE.exists():
+            self._migrate_legacy_history()
         if HISTORY_FILE.exists():
-            try:
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self.log("HISTORY", f"Loaded {len(data)} cocktail history entries.", "ok")
-                return data
-            except json.JSONDecodeError as e:
-                self.log("HISTORY", f"JSON decode error: {e} — starting fresh.", "warn")
-                return []
+            data = []
+            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+                for lineno, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        # Most likely a line torn by a crash mid-append
+                        self.log("HISTORY", f"Skipping bad line {lineno}: {e}", "warn")
+            self.log("HISTORY", f"Loaded {len(data)} cocktail history entries.", "ok")
+            return data
         self.log("HISTORY", "No cocktail history file — starting fresh.", "info")
         return []
 
+    def _migrate_legacy_history(self):
+        """One-time conversion of the old whole-file cocktail_history.json."""
+        try:
+            with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except json.JSONDecodeError as e:
+            self.log("HISTORY", f"Legacy history unreadable ({e}) — not migrated.", "warn")
+            return
+        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+        self.log("HISTORY", f"Migrated {len(entries)} entries from {LEGACY_HISTORY_FILE.name}.", "ok")
+
     def save_interaction(self, user_input, ai_response):
         ts = datetime.datetime.now().isoformat()
-        self.history.append({"timestamp": ts, "role": "user", "content": user_input})
-        self.history.append({"timestamp": ts, "role": "model", "content": ai_response})
+        entries = (
+            {"timestamp": ts, "role": "user", "content": user_input},
+            {"timestamp": ts, "role": "model", "content": ai_response},
+        )
+        self.history.extend(entries)
         HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.history, f, indent=2)
+        # Append-only: O(1) per turn, earlier entries are never rewritten
+        with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
         self.log("HISTORY", "Cocktail history saved.", "ok")
 
     # ------------------------------------------------------------------
@@ -196,28 +228,24 @@ You MUST follow ALL of these rules for every cocktail you create:
         The user_request can specify themes, spirit preferences, number of
         cocktails, occasion, season, flavour profiles, etc.
         """
+        return self._call_model(self._build_generate_prompt(user_request))
+
+    def generate_cocktails_stream(self, user_request):
+        """Streaming variant of generate_cocktails — yields text chunks."""
+        return self._call_model_stream(self._build_generate_prompt(user_request))
+
+    def _build_generate_prompt(self, user_request):
         self.log("COCKTAIL", f"Generating cocktails for request: {user_request[:120]}", "info")
         current_date = datetime.datetime.now().strftime("%B %d, %Y")
-        inventory_ctx = self._get_inventory_context()
         memory_ctx = self._get_memory_context()
 
-        prompt = f"""
-Current Date: {current_date}
-
-You are the head bartender and cocktail director at Patterson Park Patio Bar
-in Houston, Texas.  Our clientele is 23-39 year olds who appreciate creative,
-well-crafted cocktails.
-
-{memory_ctx}
-{inventory_ctx}
-
-The bar owner has made the following request:
-\"{user_request}\"
-
-Based on this request, create the cocktails they asked for.  Follow the
-COCKTAIL PRICING RULES above exactly — every cocktail needs the full recipe
-format with itemized costs, Total COGS, and Menu Price ($10-$14, targeting
-15% COGS).
+        # Guidelines first, per-request context last; the role + inventory
+        # prefix is prepended (or served from the prompt cache) by _request().
+        return f"""
+The bar owner's request is at the end of this message.  Create the cocktails
+they asked for.  Follow the COCKTAIL PRICING RULES above exactly — every
+cocktail needs the full recipe format with itemized costs, Total COGS, and
+Menu Price ($10-$14, targeting 15% COGS).
 
 Guidelines for interpreting the request:
 - If they specify a NUMBER of cocktails, create exactly that many.
@@ -232,29 +260,81 @@ Guidelines for interpreting the request:
 - Give each cocktail a creative, memorable name that fits the theme.
 - After all cocktails, provide a brief **Menu Summary** table showing each
   cocktail name, base spirit, COGS, and menu price side by side.
+{memory_ctx}
+Current Date: {current_date}
+
+The bar owner has made the following request:
+\"{user_request}\"
 """
-        return self._call_model(prompt)
 
-    def refine_cocktails(self, current_cocktails, user_feedback):
-        """Refine the current cocktail list based on user feedback."""
-        self.log("COCKTAIL", f"Refining cocktails with feedback: {user_feedback[:120]}", "info")
-        inventory_ctx = self._get_inventory_context()
-        memory_ctx = self._get_memory_context()
+    def generate_cocktails_batch(self, user_requests):
+        """Answer several independent cocktail requests with shared prompt context.
 
-        prompt = f"""
-You are the head bartender and cocktail director at Patterson Park Patio Bar.
+        Requests are sent MAX_BATCH_REQUESTS at a time; each call carries the
+        role + inventory block (or its prompt cache) once for the whole group
+        and asks for a JSON array of replies. Returns one reply string per
+        request, in order; a request whose reply can't be recovered gets an
+        ErrorReply.
+        """
+        replies = []
+        for start in range(0, len(user_requests), MAX_BATCH_REQUESTS):
+            replies.extend(self._generate_batch(user_requests[start:start + MAX_BATCH_REQUESTS]))
+        return replies
 
+    def _generate_batch(self, user_requests):
+        self.log("COCKTAIL", f"Generating cocktails for a batch of {len(user_requests)} requests", "info")
+        current_date = datetime.datetime.now().strftime("%B %d, %Y")
+        memory_ctx = self._get_memory_context()
+        numbered = "\n\n".join(
+            f"### REQUEST {i}\n{request}" for i, request in enumerate(user_requests, 1)
+        )
+
+        tail = f"""
+The bar owner has sent {len(user_requests)} separate cocktail requests, listed at
+the end of this message.  Answer each one independently.  Follow the COCKTAIL
+PRICING RULES above exactly — every cocktail needs the full recipe format with
+itemized costs, Total COGS, and Menu Price ($10-$14, targeting 15% COGS) — and
+end each answer with its own **Menu Summary** table.
+
+Reply with ONLY a JSON array, one object per request:
+[{{"request_id": 1, "response": "<markdown answer to request 1>"}}, ...]
 {memory_ctx}
-{inventory_ctx}
+Current Date: {current_date}
 
-Here are the cocktails you previously created:
----
-{current_cocktails}
----
+{numbered}
+"""
+        contents, config = self._request(tail, response_mime_type="application/json")
+        self.log("GEMINI", f"Batch prompt built — {len(contents)} chars", "info")
+        try:
+            response = self.client.models.generate_content(
+                model="gemini-pro-latest",
+                contents=contents,
+                config=config,
+            )
+            by_id = {int(item["request_id"]): item["response"] for item in json.loads(response.text)}
+            self.log("GEMINI", f"Batch response received — {len(by_id)}/{len(user_requests)} replies", "ok")
+        except Exception as e:
+            self.log("GEMINI", f"Batch error: {e}", "err")
+            return [ErrorReply(f"Error generating cocktails: {e}")] * len(user_requests)
+        return [
+            by_id.get(i, ErrorReply("Error generating cocktails: no reply for this request in the batch"))
+            for i in range(1, len(user_requests) + 1)
+        ]
 
-The bar owner has the following feedback:
-\"{user_feedback}\"
+    def refine_cocktails(self, current_cocktails, user_feedback):
+        """Refine the current cocktail list based on user feedback."""
+        return self._call_model(self._build_refine_prompt(current_cocktails, user_feedback))
 
+    def refine_cocktails_stream(self, current_cocktails, user_feedback):
+        """Streaming variant of refine_cocktails — yields text chunks."""
+        return self._call_model_stream(self._build_refine_prompt(current_cocktails, user_feedback))
+
+    def _build_refine_prompt(self, current_cocktails, user_feedback):
+        self.log("COCKTAIL", f"Refining cocktails with feedback: {user_feedback[:120]}", "info")
+        memory_ctx = self._get_memory_context()
+
+        return f"""
+Below are the cocktails you previously created and the bar owner's feedback.
 Please UPDATE the cocktail list to incorporate this feedback.  You may:
 - Modify individual cocktails (swap ingredients, adjust measurements, rename)
 - Remove cocktails the owner doesn't like
@@ -264,25 +344,76 @@ Please UPDATE the cocktail list to incorporate this feedback.  You may:
 Every cocktail in the updated list MUST still follow the COCKTAIL PRICING RULES
 above — full recipe format, itemized costs, Total COGS, and Menu Price.
 Include the updated **Menu Summary** table at the end.
+{memory_ctx}
+Here are the cocktails you previously created:
+---
+{current_cocktails}
+---
+
+The bar owner has the following feedback:
+\"{user_feedback}\"
 """
-        return self._call_model(prompt)
+
+    # ------------------------------------------------------------------
+    # Prompt cache (static role + inventory prefix held server-side)
+    # ------------------------------------------------------------------
+    def _static_prefix(self):
+        return f"\n{ROLE_TEXT}\n\n{self._get_inventory_context()}\n"
+
+    def create_prompt_cache(self, ttl_seconds=PROMPT_CACHE_TTL_SECONDS):
+        """Upload the role + inventory prefix as a Gemini cached content, or
+        reuse the process-wide copy (see prompt_cache), so later calls only
+        send the per-request tail. Best effort: prompts keep the full prefix
+        if Gemini rejects the cache.
+        """
+        cache = PromptCache(self.client, self._static_prefix(), ttl_seconds, self.log)
+        self._prompt_cache = cache if cache.name() else None
+
+    def _request(self, tail, **config):
+        """Return (contents, config) for a gemini-pro-latest call: just the tail
+        against the prompt cache when one is live, else the full prompt."""
+        cached = self._prompt_cache.name() if self._prompt_cache else None
+        if cached:
+            return tail, types.GenerateContentConfig(cached_content=cached, **config)
+        return self._static_prefix() + tail, (types.GenerateContentConfig(**config) if config else None)
 
     # ------------------------------------------------------------------
     # Model call
     # ------------------------------------------------------------------
-    def _call_model(self, prompt):
+    def _call_model(self, tail):
+        """Blocking call with a hedged fallback; see model_hedge.hedged_generate()."""
+        prompt, config = self._request(tail)
         self.log("GEMINI", f"Prompt built — {len(prompt)} chars", "info")
         self.log("GEMINI", "Sending to model='gemini-pro-latest'...", "info")
+        # The prompt cache belongs to the primary model; the fallback needs
+        # the full prompt
+        fallback_prompt = self._static_prefix() + tail if config else prompt
+        return hedged_generate(self.client, self.log, prompt, config, fallback_prompt, "Error generating cocktails")
+
+    def _call_model_stream(self, tail):
+        """Generator version of _call_model — yields text chunks as they arrive."""
+        received = 0
         try:
-            response = self.client.models.generate_content(
+            prompt, config = self._request(tail)
+            self.log("GEMINI", f"Prompt built — {len(prompt)} chars", "info")
+            self.log("GEMINI", "Streaming from model='gemini-pro-latest'...", "info")
+            stream = self.client.models.generate_content_stream(
                 model="gemini-pro-latest",
                 contents=prompt,
+                config=config,
             )
-            self.log("GEMINI", f"Response received — {len(response.text)} chars", "ok")
-            return response.text
+            try:
+                for chunk in stream:
+                    if chunk.text:
+                        received += len(chunk.text)
+                        yield chunk.text
+            finally:
+                # Runs on GeneratorExit too, so a dropped generator frees the HTTP stream
+                stream.close()
+            self.log("GEMINI", f"Stream complete — {received} chars", "ok")
         except Exception as e:
             self.log("GEMINI", f"Model error: {e}", "err")
-            return f"Error generating cocktails: {e}"
+            yield ErrorReply(f"Error generating cocktails: {e}")
 
 
 # ----------------------------------------------------------------------
@@ -312,10 +443,13 @@ def main():
         if not feedback:
             continue
 
-        result = agent.refine_cocktails(result, feedback)
-        agent.save_interaction(feedback, result)
+        refined = agent.refine_cocktails(result, feedback)
         print("\n" + "=" * 50)
-        print(result)
+        print(refined)
+        if isinstance(refined, ErrorReply):
+            continue  # keep refining the last good list
+        result = refined
+        agent.save_interaction(feedback, result)
 
 
 if __name__ == "__main__":
@@ -8,16 +8,18 @@ GUI uses to pipe behind-the-scenes activity into the debug console.
 """
 
 import os
+import asyncio
 import datetime
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, timezone
-import dateutil.parser
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from google import genai
 from google.genai import types
 
+from agent_errors import ErrorReply
+from response_cache import ResponseCache
+
 try:
     import secrets_config
 except ImportError:
@@ -29,6 +31,53 @@ SCOPES = [
     'https://www.googleapis.com/auth/calendar.readonly'
 ]
 GOOGLE_ACCOUNTS = ['bar', 'manager']
+CALENDAR_DAYS = 7           # default sync window; the Party Planner reuses it
+BRIEFING_CALENDAR_DAYS = 2  # the briefing prompt only covers the next 48 hours
+_AUTH_LOCK = threading.Lock()
+MESSAGE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gmail_cache.db")
+MESSAGE_CACHE_TTL_SECONDS = 14 * 24 * 3600  # well past the 5-day inbox query window
+_MESSAGE_CACHE = None
+_MESSAGE_CACHE_LOCK = threading.Lock()
+
+
+# --- PROMPT TEXT ---
+_SYSTEM_INSTRUCTION = """
+You are the owner and creative visionary of **Patterson Park Patio Bar** in Houston, Texas.
+You are creative and appeal to an upper-middle-class demographic (ages 23-39) in the Heights/Rice Military area.
+You make all decisions regarding operations, including event planning, scheduling, and high-level strategy.
+
+**Your Goal:**
+Review the raw data (calendar/emails) to provide specific instructions for managers and employees for the immediate future.
+Balance operational rigor with creative flair (party ideas, decor, menu specials).
+
+If the user has asked a specific question or made a request (see USER REQUEST section),
+focus your response on answering that question using the available data.
+Otherwise, produce the full Daily Battle Plan.
+
+## THE FORECAST & STRATEGY
+(Synthesize weather + calendar. Predict crowd size: Low/Med/High. Define the "Vibe" for the day/night. include music types, volume levels, lighting for both day, happy hour, and night.)
+
+## MANAGER ORDERS (Logistics & Ops)
+(Specific tasks: Inventory needs, repair orders, staffing adjustments, VIP table management.)
+
+## CREATIVE DIRECTIVE (Events & Promo)
+- **Today/Tomorrow:** Daily specials, music selection, lighting cues.
+- **This Week:** Upcoming weekend themes, social media hooks.
+- **Future:** Ideas for parties, decorations, or menu changes based on what you see in the calendar.
+
+## ACTION ITEMS (FROM EMAILS)
+(Scan email snippets for tasks like "please send," "confirm," "sign," or deadlines.)
+- [ ] Task 1
+- [ ] Task 2
+
+## PRE-SHIFT RALLY (Staff Instructions)
+(Talking points for the staff meeting. Upselling focuses, service standards, and energy maintenance.)
+"""
+
+_CAL_HEADER = "--- CALENDAR (NEXT 48 HOURS) ---\n"
+_EMAIL_HEADER = "\n--- RECENT EMAILS ---\n"
+_CAL_LINE = "- {detail} : {title} [{source}]\n"
+_EMAIL_LINE = "- From: {detail} | Subject: {title} | Snippet: {snippet}\n"
 
 
 def _noop_log(category, message, level="info"):
@@ -37,102 +86,139 @@ def _noop_log(category, message, level="info"):
 
 
 class AIAssistant:
-    def __init__(self, api_key, log_fn=None, memory_manager=None):
+    def __init__(self, api_key, log_fn=None, memory_manager=None, client=None):
         self.log = log_fn or _noop_log
         self.memory_manager = memory_manager
-        self.log("GEMINI", "Initialising genai.Client...", "info")
-        self.client = genai.Client(api_key=api_key)
-        self.log("GEMINI", "genai.Client ready.", "ok")
+        if client is not None:
+            self.client = client
+            self.log("GEMINI", "Using shared genai.Client.", "ok")
+        else:
+            self.log("GEMINI", "Initialising genai.Client...", "info")
+            self.client = genai.Client(api_key=api_key)
+            self.log("GEMINI", "genai.Client ready.", "ok")
+        self._config = types.GenerateContentConfig(system_instruction=_SYSTEM_INSTRUCTION)
         if self.memory_manager:
             self.log("GEMINI", "Shared MemoryManager attached.", "ok")
 
     def generate_briefing(self, calendar_events, emails, user_message=None):
         """Generate the daily battle plan. If user_message is provided, it is
         appended to the data feed so the LLM can address it directly."""
+        data_feed = self._build_request(calendar_events, emails, user_message)
+
+        self.log("GEMINI", "Sending request to model='gemini-pro-latest'...", "info")
+        try:
+            response = self.client.models.generate_content(
+                model='gemini-pro-latest',
+                contents=data_feed,
+                config=self._config
+            )
+            self.log("GEMINI", f"Response received — {len(response.text)} chars", "ok")
+            return response.text
+        except Exception as e:
+            self.log("GEMINI", f"API error: {e}", "err")
+            return ErrorReply(f"Error generating Gemini summary: {e}")
+
+    def generate_briefing_stream(self, calendar_events, emails, user_message=None):
+        """Streaming variant of generate_briefing — yields text chunks."""
+        data_feed = self._build_request(calendar_events, emails, user_message)
+
+        self.log("GEMINI", "Streaming from model='gemini-pro-latest'...", "info")
+        received = 0
+        try:
+            stream = self.client.models.generate_content_stream(
+                model='gemini-pro-latest',
+                contents=data_feed,
+                config=self._config
+            )
+            try:
+                for chunk in stream:
+                    if chunk.text:
+                        received += len(chunk.text)
+                        yield chunk.text
+            finally:
+                # Also on GeneratorExit: a caller that drops us mid-reply frees the socket
+                stream.close()
+            self.log("GEMINI", f"Stream complete — {received} chars", "ok")
+        except Exception as e:
+            self.log("GEMINI", f"API error: {e}", "err")
+            yield ErrorReply(f"Error generating Gemini summary: {e}")
 
+    def _build_request(self, calendar_events, emails, user_message=None):
+        """Return the data feed (user contents) for a briefing call."""
         self.log("GEMINI", "Building data feed for Gemini prompt...", "info")
 
-        current_time = datetime.datetime.now().strftime("%A, %B %d, %I:%M %p")
-        data_feed = f"CURRENT TIME: {current_time}\n\n"
+        # Synced data first, then the parts that change between calls (memory,
+        # clock, user request) so repeated prompts share a common prefix.
+        now = datetime.datetime.now()
+        cutoff = now + timedelta(days=BRIEFING_CALENDAR_DAYS)  # loop-invariant: computed once
+        parts = [_CAL_HEADER]
+        cal_lines = [
+            _CAL_LINE.format_map(event)
+            for event in calendar_events if event['sort_key'] < cutoff
+        ]
+        parts.extend(cal_lines)
+        self.log("GEMINI", f"Calendar events included in prompt: {len(cal_lines)}", "info")
+
+        parts.append(_EMAIL_HEADER)
+        parts.extend(_EMAIL_LINE.format_map(email) for email in emails)
+        self.log("GEMINI", f"Emails included in prompt: {len(emails)}", "info")
 
         # Inject shared memory context (owner preferences, decisions, etc.)
         if self.memory_manager:
             memory_ctx = self.memory_manager.get_memory_context()
             if memory_ctx:
-                data_feed += memory_ctx + "\n\n"
+                parts.append(f"\n{memory_ctx}\n")
                 self.log("GEMINI", f"Memory context injected — {len(memory_ctx)} chars", "info")
 
-        cal_count = 0
-        data_feed += "--- CALENDAR (NEXT 48 HOURS) ---\n"
-        for event in calendar_events:
-            if event['sort_key'] < datetime.datetime.now() + timedelta(days=2):
-                data_feed += f"- {event['detail']} : {event['title']} [{event['source']}]\n"
-                cal_count += 1
-        self.log("GEMINI", f"Calendar events included in prompt: {cal_count}", "info")
-
-        data_feed += "\n--- RECENT EMAILS ---\n"
-        for email in emails:
-            data_feed += f"- From: {email['detail']} | Subject: {email['title']} | Snippet: {email['snippet']}\n"
-        self.log("GEMINI", f"Emails included in prompt: {len(emails)}", "info")
+        current_time = now.strftime("%A, %B %d, %I:%M %p")
+        parts.append(f"\nCURRENT TIME: {current_time}\n")
 
         if user_message:
-            data_feed += f"\n--- USER REQUEST ---\n{user_message}\n"
+            parts.append(f"\n--- USER REQUEST ---\n{user_message}\n")
             self.log("GEMINI", f"User request appended ({len(user_message)} chars)", "info")
 
+        data_feed = "".join(parts)
         self.log("GEMINI", f"Total prompt size: {len(data_feed)} chars", "info")
 
-        system_instruction = """
-        You are the owner and creative visionary of **Patterson Park Patio Bar** in Houston, Texas.
-        You are creative and appeal to an upper-middle-class demographic (ages 23-39) in the Heights/Rice Military area.
-        You make all decisions regarding operations, including event planning, scheduling, and high-level strategy.
-
-        **Your Goal:**
-        Review the raw data (calendar/emails) to provide specific instructions for managers and employees for the immediate future.
-        Balance operational rigor with creative flair (party ideas, decor, menu specials).
+        return data_feed
 
-        If the user has asked a specific question or made a request (see USER REQUEST section),
-        focus your response on answering that question using the available data.
-        Otherwise, produce the full Daily Battle Plan.
-
-        ## THE FORECAST & STRATEGY
-        (Synthesize weather + calendar. Predict crowd size: Low/Med/High. Define the "Vibe" for the day/night. include music types, volume levels, lighting for both day, happy hour, and night.)
+    def chat(self, calendar_events, emails, user_message):
+        """Convenience wrapper: always includes the user message."""
+        self.log("GEMINI", "chat() called — delegating to generate_briefing()", "info")
+        return self.generate_briefing(calendar_events, emails, user_message=user_message)
 
-        ## MANAGER ORDERS (Logistics & Ops)
-        (Specific tasks: Inventory needs, repair orders, staffing adjustments, VIP table management.)
+    def chat_stream(self, calendar_events, emails, user_message):
+        """Streaming variant of chat — yields text chunks."""
+        self.log("GEMINI", "chat_stream() called — delegating to generate_briefing_stream()", "info")
+        return self.generate_briefing_stream(calendar_events, emails, user_message=user_message)
 
-        ## CREATIVE DIRECTIVE (Events & Promo)
-        - **Today/Tomorrow:** Daily specials, music selection, lighting cues.
-        - **This Week:** Upcoming weekend themes, social media hooks.
-        - **Future:** Ideas for parties, decorations, or menu changes based on what you see in the calendar.
 
-        ## ACTION ITEMS (FROM EMAILS)
-        (Scan email snippets for tasks like "please send," "confirm," "sign," or deadlines.)
-        - [ ] Task 1
-        - [ ] Task 2
+def _message_cache(log):
+    """Process-wide Gmail message metadata cache, opened on first use."""
+    global _MESSAGE_CACHE
+    with _MESSAGE_CACHE_LOCK:
+        if _MESSAGE_CACHE is None:
+            _MESSAGE_CACHE = ResponseCache(
+                log_fn=log, cache_path=MESSAGE_CACHE_FILE, ttl=MESSAGE_CACHE_TTL_SECONDS
+            )
+        return _MESSAGE_CACHE
 
-        ## PRE-SHIFT RALLY (Staff Instructions)
-        (Talking points for the staff meeting. Upselling focuses, service standards, and energy maintenance.)
-        """
 
-        self.log("GEMINI", "Sending request to model='gemini-pro-latest'...", "info")
-        try:
-            response = self.client.models.generate_content(
-                model='gemini-pro-latest',
-                contents=data_feed,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction
-                )
-            )
-            self.log("GEMINI", f"Response received — {len(response.text)} chars", "ok")
-            return response.text
-        except Exception as e:
-            self.log("GEMINI", f"API error: {e}", "err")
-            return f"Error generating Gemini summary: {e}"
+def _parse_event_time(start):
+    """Parse a Calendar start value ('dateTime' RFC 3339 or all-day 'date').
 
-    def chat(self, calendar_events, emails, user_message):
-        """Convenience wrapper: always includes the user message."""
-        self.log("GEMINI", "chat() called — delegating to generate_briefing()", "info")
-        return self.generate_briefing(calendar_events, emails, user_message=user_message)
+    datetime.fromisoformat covers everything the Calendar API emits; dateutil
+    is only imported for anything it rejects.
+    """
+    try:
+        return datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        pass
+    try:
+        import dateutil.parser
+        return dateutil.parser.parse(start)
+    except Exception:
+        return datetime.datetime.now()
 
 
 class GoogleClient:
@@ -145,6 +231,12 @@ class GoogleClient:
         self.token_file = f'token_{account_name}.json'
 
     def authenticate(self):
+        # Imported here: the auth/discovery stack is slow to load and only the
+        # Google sync needs it, not AIAssistant users or the other agents.
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
         self.log("AUTH", f"[{self.account_name}] Checking for cached token: {self.token_file}", "info")
 
         if os.path.exists(self.token_file):
@@ -167,6 +259,7 @@ class GoogleClient:
                     return
             else:
                 self.log("AUTH", f"[{self.account_name}] Launching OAuth2 browser flow...", "warn")
+                from google_auth_oauthlib.flow import InstalledAppFlow
                 flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
                 self.creds = flow.run_local_server(port=0)
                 self.log("AUTH", f"[{self.account_name}] OAuth2 complete.", "ok")
@@ -189,21 +282,68 @@ class GoogleClient:
         self.log("GMAIL", f"[{self.account_name}] Querying INBOX: '{query}'", "info")
         try:
             results = self.gmail_service.users().messages().list(
-                userId='me', labelIds=['INBOX'], q=query, maxResults=50
+                userId='me', labelIds=['INBOX'], q=query, maxResults=50,
+                fields='messages(id)'
             ).execute()
             messages = results.get('messages', [])
             if not messages:
                 self.log("GMAIL", f"[{self.account_name}] No messages found.", "info")
                 return []
 
-            self.log("GMAIL", f"[{self.account_name}] Found {len(messages)} message IDs — fetching details...", "info")
+            # Subject/From/snippet never change for a message id, so only ids
+            # we have not seen before are fetched
+            cache = _message_cache(self.log)
+            known = {}
+            for msg in messages:
+                hit = cache.get(f"gmail|{self.account_name}|{msg['id']}")
+                if hit is not None:
+                    known[msg['id']] = json.loads(hit)
+            to_fetch = [msg for msg in messages if msg['id'] not in known]
+            self.log(
+                "GMAIL",
+                f"[{self.account_name}] Found {len(messages)} message IDs — "
+                f"{len(known)} cached, fetching {len(to_fetch)}...",
+                "info",
+            )
+
+            # One batched HTTP request for every messages.get (Gmail allows up
+            # to 100 per batch; maxResults above is 50). Metadata format, only
+            # the headers we read and a `fields` partial response keep each
+            # sub-response down to what the loop below uses.
+            responses = {}
+
+            def _collect(request_id, response, exception):
+                responses[request_id] = (response, exception)
+
+            if to_fetch:
+                batch = self.gmail_service.new_batch_http_request(callback=_collect)
+                for msg in to_fetch:
+                    batch.add(
+                        self.gmail_service.users().messages().get(
+                            userId='me', id=msg['id'], format='metadata',
+                            metadataHeaders=['Subject', 'From'],
+                            fields='payload/headers,snippet'
+                        ),
+                        request_id=msg['id'],
+                    )
+                batch.execute()
+
+            for msg_id, (txt, exc) in responses.items():
+                if exc is not None or txt is None:
+                    self.log("GMAIL", f"[{self.account_name}] Could not fetch message {msg_id}: {exc}", "warn")
+                    continue
+                headers = txt.get('payload', {}).get('headers', [])
+                # Reversed so a repeated header keeps its first value, as the old scan did
+                hdr = {h['name']: h['value'] for h in reversed(headers)}
+                meta = [hdr.get('Subject', "No Subject"), hdr.get('From', "Unknown"), txt.get('snippet', '')]
+                known[msg_id] = meta
+                cache.set(f"gmail|{self.account_name}|{msg_id}", json.dumps(meta))
+
             email_data = []
-            for i, msg in enumerate(messages):
-                txt = self.gmail_service.users().messages().get(userId='me', id=msg['id']).execute()
-                headers = txt['payload'].get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), "No Subject")
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), "Unknown")
-                snippet = txt.get('snippet', '')
+            for msg in messages:  # list order (newest first), cached or not
+                if msg['id'] not in known:
+                    continue
+                subject, sender, snippet = known[msg['id']]
                 email_data.append({
                     "type": "Email",
                     "source": f"Gmail ({self.account_name})",
@@ -211,8 +351,6 @@ class GoogleClient:
                     "detail": sender,
                     "snippet": snippet
                 })
-                if (i + 1) % 10 == 0:
-                    self.log("GMAIL", f"[{self.account_name}] Fetched {i + 1}/{len(messages)} emails...", "info")
 
             self.log("GMAIL", f"[{self.account_name}] {len(email_data)} emails fetched.", "ok")
             return email_data
@@ -226,7 +364,9 @@ class GoogleClient:
             return []
         self.log("CALENDAR", f"[{self.account_name}] Fetching calendar list...", "info")
         try:
-            calendar_list = self.calendar_service.calendarList().list().execute()
+            calendar_list = self.calendar_service.calendarList().list(
+                fields='items(id,summary)'
+            ).execute()
             calendars = calendar_list.get('items', [])
             self.log("CALENDAR", f"[{self.account_name}] Found {len(calendars)} calendars.", "info")
         except Exception as e:
@@ -237,76 +377,144 @@ class GoogleClient:
         now = datetime.datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         end_time = (datetime.datetime.now(timezone.utc) + timedelta(days=days)).isoformat().replace('+00:00', 'Z')
 
+        to_query = []
         for cal in calendars:
             cal_name = cal.get('summary', '(unnamed)')
             if 'holiday' in cal_name.lower() or 'contacts' in cal_name.lower():
                 self.log("CALENDAR", f"[{self.account_name}] Skipping calendar: {cal_name}", "info")
                 continue
+            to_query.append((cal, cal_name))
+
+        # Query every calendar at once: one batched HTTP request instead of a
+        # serial events.list round trip per calendar
+        results = {}
+
+        def _collect(request_id, response, exception):
+            results[request_id] = (response, exception)
+
+        batch = self.calendar_service.new_batch_http_request(callback=_collect)
+        for cal, cal_name in to_query:
             self.log("CALENDAR", f"[{self.account_name}] Querying: {cal_name}...", "info")
-            try:
-                events_result = self.calendar_service.events().list(
+            batch.add(
+                self.calendar_service.events().list(
                     calendarId=cal['id'], timeMin=now, timeMax=end_time,
-                    maxResults=10, singleEvents=True, orderBy='startTime'
-                ).execute()
-                events = events_result.get('items', [])
-                self.log("CALENDAR", f"[{self.account_name}]   -> {len(events)} events", "info")
-                for event in events:
-                    start = event['start'].get('dateTime', event['start'].get('date'))
-                    summary = event.get('summary', '(No Title)')
-                    try:
-                        dt_object = dateutil.parser.parse(start)
-                    except Exception:
-                        dt_object = datetime.datetime.now()
-                    if 'T' in start:
-                        display_time = dt_object.strftime("%H:%M")
-                    else:
-                        display_time = "All Day"
-                    events_data.append({
-                        "type": "Calendar",
-                        "source": f"Google ({self.account_name})",
-                        "title": summary,
-                        "detail": display_time,
-                        "sort_key": dt_object.replace(tzinfo=None)
-                    })
+                    maxResults=10, singleEvents=True, orderBy='startTime',
+                    fields='items(summary,start)'
+                ),
+                request_id=cal['id'],
+            )
+        if to_query:
+            try:
+                batch.execute()
             except Exception as e:
-                self.log("CALENDAR", f"[{self.account_name}] Error for calendar '{cal_name}': {e}", "err")
+                self.log("CALENDAR", f"[{self.account_name}] Batch request failed: {e}", "err")
+                return []
+
+        for cal, cal_name in to_query:
+            events_result, exc = results.get(cal['id'], (None, None))
+            if exc is not None or events_result is None:
+                self.log("CALENDAR", f"[{self.account_name}] Error for calendar '{cal_name}': {exc}", "err")
                 continue
+            events = events_result.get('items', [])
+            self.log("CALENDAR", f"[{self.account_name}]   -> {len(events)} events ({cal_name})", "info")
+            for event in events:
+                start = event['start'].get('dateTime', event['start'].get('date'))
+                summary = event.get('summary', '(No Title)')
+                dt_object = _parse_event_time(start)
+                if 'T' in start:
+                    display_time = dt_object.strftime("%H:%M")
+                else:
+                    display_time = "All Day"
+                events_data.append({
+                    "type": "Calendar",
+                    "source": f"Google ({self.account_name})",
+                    "title": summary,
+                    "detail": display_time,
+                    "sort_key": dt_object.replace(tzinfo=None),
+                    # Formatted once here so prompt builders can group by day as-is
+                    "date_str": dt_object.strftime("%A, %B %d"),
+                })
 
         self.log("CALENDAR", f"[{self.account_name}] Total events collected: {len(events_data)}", "ok")
         return events_data
 
 
-def sync_google_data(log_fn=None):
-    """Fetch calendar events and emails from all configured Google accounts.
-    Returns (calendar_events, emails)."""
+def sync_google_data(log_fn=None, days=CALENDAR_DAYS):
+    """Fetch calendar events (next `days` days) and emails from all configured
+    Google accounts. Returns (calendar_events, emails)."""
+    log = log_fn or _noop_log
+    # Accounts are I/O-bound and independent: sync them side by side
+    with ThreadPoolExecutor(max_workers=len(GOOGLE_ACCOUNTS), thread_name_prefix="google-sync") as ex:
+        futures = [ex.submit(_sync_account, account, log, days) for account in GOOGLE_ACCOUNTS]
+        results = [future.result() for future in futures]  # account order keeps the output stable
+    return _merge_synced(results, log)
+
+
+def _sync_account(account, log, days=CALENDAR_DAYS):
+    """Authenticate one account and fetch its (calendar events, emails)."""
+    log("SYNC", f"--- Syncing account: {account} ---", "info")
+    g_client = GoogleClient(account, log_fn=log)
+    with _AUTH_LOCK:  # one OAuth browser flow at a time
+        g_client.authenticate()
+    events = g_client.get_calendar_events(days=days)
+    emails = g_client.get_recent_emails(days=5)
+    log("SYNC", f"--- Account '{account}' done ---", "ok")
+    return events, emails
+
+
+async def sync_google_data_async(log_fn=None, days=CALENDAR_DAYS):
+    """Concurrent variant of sync_google_data for callers on an asyncio loop.
+
+    Accounts sync in parallel, and each account's calendar and Gmail fetches
+    run at the same time in worker threads (the GIL is released during the
+    HTTP reads). Authentication is serialised so at most one OAuth browser
+    flow is open at once. Returns (calendar_events, emails).
+    """
     log = log_fn or _noop_log
-    all_data = []
-    for account in GOOGLE_ACCOUNTS:
+    auth_lock = asyncio.Lock()
+
+    async def _sync_account(account):
         log("SYNC", f"--- Syncing account: {account} ---", "info")
         g_client = GoogleClient(account, log_fn=log)
-        g_client.authenticate()
-        all_data.extend(g_client.get_calendar_events(days=7))
-        all_data.extend(g_client.get_recent_emails(days=5))
+        async with auth_lock:
+            await asyncio.to_thread(g_client.authenticate)
+        events, emails = await asyncio.gather(
+            asyncio.to_thread(g_client.get_calendar_events, days=days),
+            asyncio.to_thread(g_client.get_recent_emails, days=5),
+        )
         log("SYNC", f"--- Account '{account}' done ---", "ok")
+        return events, emails
 
-    calendar_events = sorted(
-        [x for x in all_data if x['type'] == 'Calendar'],
-        key=lambda x: x['sort_key']
-    )
-    emails = [x for x in all_data if x['type'] == 'Email']
+    results = await asyncio.gather(*(_sync_account(a) for a in GOOGLE_ACCOUNTS))
+    return _merge_synced(results, log)
+
+
+def _merge_synced(results, log):
+    """Merge per-account (events, emails) pairs into (sorted calendar_events, emails).
+
+    Each fetcher already returns one kind of item, so no pass over the merged
+    data is needed to sort them back apart by 'type'.
+    """
+    calendar_events, emails = [], []
+    for events, account_emails in results:
+        calendar_events.extend(events)
+        emails.extend(account_emails)
+    calendar_events.sort(key=lambda x: x['sort_key'])
     log("SYNC", f"All accounts synced. Calendar: {len(calendar_events)}, Emails: {len(emails)}", "ok")
     return calendar_events, emails
 
 
-def run_briefing(user_message=None, log_fn=None):
+def run_briefing(user_message=None, log_fn=None, days=BRIEFING_CALENDAR_DAYS):
     """Run the daily briefing agent. If user_message is provided, it will
-    be included in the prompt so the LLM addresses that specific query."""
+    be included in the prompt so the LLM addresses that specific query.
+
+    Only `days` of calendar are fetched, since nothing else reuses the sync."""
     log = log_fn or _noop_log
     if not secrets_config or not hasattr(secrets_config, 'GEMINI_API_KEY'):
         log("BRIEFING", "GEMINI_API_KEY missing.", "err")
         return "Gemini API Key missing in secrets_config.py."
 
-    calendar_events, emails = sync_google_data(log_fn=log)
+    calendar_events, emails = sync_google_data(log_fn=log, days=days)
     ai = AIAssistant(secrets_config.GEMINI_API_KEY, log_fn=log)
 
     if user_message:
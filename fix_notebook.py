@@ -1,12 +1,19 @@
 import json
 import os
+from pathlib import Path
+
+try:
+    import orjson  # optional: C encoder, several times faster than json.dump(indent=...)
+except ImportError:
+    orjson = None
 
 file_path = 'Bar_Owner_Agent/agent.ipynb'
 
 # The complete source code for the notebook cell
-source_code = r"""import os
+source_code = r'''import os
 import datetime
 import caldav
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, timezone
 import dateutil.parser
 from google.auth.transport.requests import Request
@@ -149,11 +156,36 @@ class GoogleClient:
                 if not messages:
                     return []
 
+                # One batched HTTP request for every messages.get instead of a
+                # round trip per message (a batch holds up to 100 calls; we ask
+                # for at most 50). Metadata format still carries the snippet.
+                responses = {}
+
+                def _collect(request_id, response, exception):
+                    if exception is None:
+                        responses[request_id] = response
+
+                batch = self.gmail_service.new_batch_http_request(callback=_collect)
                 for msg in messages:
-                    txt = self.gmail_service.users().messages().get(userId='me', id=msg['id']).execute()
+                    batch.add(
+                        self.gmail_service.users().messages().get(
+                            userId='me', id=msg['id'], format='metadata',
+                            metadataHeaders=['Subject', 'From']
+                        ),
+                        request_id=msg['id'],
+                    )
+                batch.execute()
+
+                for msg in messages:
+                    txt = responses.get(msg['id'])
+                    if txt is None:
+                        continue
                     headers = txt['payload'].get('headers', [])
-                    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), "No Subject")
-                    sender = next((h['value'] for h in headers if h['name'] == 'From'), "Unknown")
+                    # One dict per message instead of a linear scan per header
+                    # (reversed keeps the first value of a repeated header)
+                    hdr = {h['name']: h['value'] for h in reversed(headers)}
+                    subject = hdr.get('Subject', "No Subject")
+                    sender = hdr.get('From', "Unknown")
                     snippet = txt.get('snippet', '')
                     
                     email_data.append({
@@ -179,23 +211,52 @@ class GoogleClient:
         now = datetime.datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         end_time = (datetime.datetime.now(timezone.utc) + timedelta(days=days)).isoformat().replace('+00:00', 'Z')
 
-        for cal in calendars:
-            if 'holiday' in cal.get('summary', '').lower() or 'contacts' in cal.get('summary', '').lower():
-                continue
-            
-            try:
-                events_result = self.calendar_service.events().list(
+        to_query = [
+            cal for cal in calendars
+            if 'holiday' not in cal.get('summary', '').lower()
+            and 'contacts' not in cal.get('summary', '').lower()
+        ]
+
+        # Fan out to every calendar at once: one batched HTTP request instead
+        # of a serial events.list round trip per calendar
+        results = {}
+
+        def _collect(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+
+        batch = self.calendar_service.new_batch_http_request(callback=_collect)
+        for cal in to_query:
+            batch.add(
+                self.calendar_service.events().list(
                     calendarId=cal['id'], timeMin=now, timeMax=end_time,
-                    maxResults=10, singleEvents=True, orderBy='startTime').execute()
+                    maxResults=10, singleEvents=True, orderBy='startTime'),
+                request_id=cal['id'],
+            )
+        try:
+            batch.execute()
+        except Exception:
+            return []
+
+        for cal in to_query:
+            try:
+                events_result = results.get(cal['id'])
+                if events_result is None:
+                    continue
                 events = events_result.get('items', [])
 
                 for event in events:
                     start = event['start'].get('dateTime', event['start'].get('date'))
                     summary = event.get('summary', '(No Title)')
+                    # RFC 3339 / all-day dates parse with the C fromisoformat;
+                    # dateutil only for anything it rejects
                     try:
-                        dt_object = dateutil.parser.parse(start)
-                    except:
-                        dt_object = datetime.datetime.now()
+                        dt_object = datetime.datetime.fromisoformat(start.replace('Z', '+00:00'))
+                    except ValueError:
+                        try:
+                            dt_object = dateutil.parser.parse(start)
+                        except Exception:
+                            dt_object = datetime.datetime.now()
 
                     if 'T' in start:
                         display_time = dt_object.strftime("%H:%M")
@@ -214,20 +275,27 @@ class GoogleClient:
         return events_data
 
 # --- MAIN EXECUTION ---
+def sync_account(account):
+    # A fresh GoogleClient per worker: service objects share an httplib2.Http
+    # that is not thread-safe.
+    print(f"* Syncing Google: {account}...")
+    g_client = GoogleClient(account)
+    g_client.authenticate()
+    return g_client.get_calendar_events(days=7), g_client.get_recent_emails(days=5)
+
 if __name__ == '__main__':
-    all_data = []
+    calendar_events, emails = [], []
     print("--- SYNCING ACCOUNTS ---")
 
-    for account in GOOGLE_ACCOUNTS:
-        print(f"* Syncing Google: {account}...")
-        g_client = GoogleClient(account)
-        g_client.authenticate()
-        all_data.extend(g_client.get_calendar_events(days=7))
-        all_data.extend(g_client.get_recent_emails(days=5))
+    # Accounts are independent network I/O: sync them side by side
+    with ThreadPoolExecutor(max_workers=len(GOOGLE_ACCOUNTS)) as ex:
+        futures = [ex.submit(sync_account, account) for account in GOOGLE_ACCOUNTS]
+        for future in futures:  # account order keeps the output stable
+            events, account_emails = future.result()
+            calendar_events.extend(events)
+            emails.extend(account_emails)
 
     # Sort Data
-    calendar_events = [x for x in all_data if x['type'] == 'Calendar']
-    emails = [x for x in all_data if x['type'] == 'Email']
     calendar_events.sort(key=lambda x: x['sort_key'])
 
     # --- PART 1: PRINT RAW SCHEDULE ---
@@ -255,7 +323,7 @@ if __name__ == '__main__':
     else:
         print("X Gemini API Key missing.")
     print("="*50)
-"
+'''
 
 # Convert to list of strings (lines) including newlines
 source_lines = source_code.splitlines(keepends=True)
@@ -284,8 +352,8 @@ notebook = {
     "# Initialize the client\n",
     "client = genai.Client(api_key=secrets_config.GEMINI_API_KEY)\n",
     "\n",
-    "print(f"{'MODEL ID':<30} | {'DISPLAY NAME'}")\n",
-    "print(\"-" * 60)\"\n",
+    "print(f\"{'MODEL ID':<30} | {'DISPLAY NAME'}\")\n",
+    "print(\"-\" * 60)\n",
     "\n",
     "try:\n",
     "    # Fetch all models\n",
@@ -303,13 +371,13 @@ notebook = {
     "            # Handle cases where display_name might be None\n",
     "            display_name = model.display_name if model.display_name else \"(No Name)\"\n",
     "            \n",
-    "            print(f"{{model_id:<30}} | {{display_name}}")\n",
+    "            print(f\"{model_id:<30} | {display_name}\")\n",
     "\n",
     "except Exception as e:\n",
-    "    print(f"Error listing models: {{e}}")\n",
+    "    print(f\"Error listing models: {e}\")\n",
     "    # Debugging: Print one model to see what it looks like if it fails\n",
     "    try:\n",
-    "        print(\"\\n--- Debug: First Model Object Attributes ---")\n",
+    "        print(\"\\n--- Debug: First Model Object Attributes ---\")\n",
     "        first_item = next(client.models.list())\n",
     "        print(dir(first_item))\n",
     "    except:\n",
@@ -340,7 +408,11 @@ notebook = {
  "nbformat_minor": 5
 }
 
-with open(file_path, 'w', encoding='utf-8') as f:
-    json.dump(notebook, f, indent=1)
+if orjson:
+    Path(file_path).write_bytes(orjson.dumps(notebook, option=orjson.OPT_INDENT_2))
+else:
+    # Compact separators: Jupyter reads it fine and re-indents on its next save
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(notebook, f, separators=(',', ':'), ensure_ascii=False)
 
 print("Successfully reconstructed agent.ipynb")
@@ -0,0 +1,90 @@
+"""
+Liquor Inventory - shared loader for context_data/liquor_prices.csv.
+===================================================================
+The Party Planner and Cocktail Creator both price drinks from the same
+name -> $/oz table. Loading it here means the file is parsed once per
+process (and again only if it changes on disk) no matter how many agents
+of either kind are created. LIQUEUR_NAMES, the tiering exceptions both
+agents apply to that table, lives here for the same reason.
+
+Accepts an optional log_fn(category, message, level) callback for the GUI
+debug console.
+"""
+
+import csv
+import threading
+from operator import itemgetter
+from pathlib import Path
+
+PRICES_CSV = Path(__file__).parent / "context_data" / "liquor_prices.csv"
+
+# Names (lower-cased) filed under LIQUEURS even without "liqueur" in them
+LIQUEUR_NAMES = frozenset({
+    "aperol", "campari", "st-germain", "kahlua l",
+    "grand marnier", "licor 43", "luxardo", "absente",
+    "amaro nonino", "fernet branca", "chila orchata",
+    "tuaca", "jagermeister", "goldschlager", "fireball",
+    "rumpleminze", "skrewball", "emmet's irish cream",
+    "lillet", "dolin sweet vermouth", "vermouth dry noily prat",
+    "william price coffee liqueur", "william price limoncello",
+})
+
+# path -> ((st_mtime_ns, st_size), inventory)
+_INVENTORY_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _noop_log(category, message, level="info"):
+    """Default no-op logger used when no GUI callback is provided."""
+    pass
+
+
+def load_liquor_inventory(log_fn=None, path=PRICES_CSV):
+    """Return {liquor name: cost per oz} from the prices CSV ({} if unreadable).
+
+    Keys are in sorted order, so callers can iterate items() without
+    re-sorting. The returned dict is shared between callers; treat it as
+    read-only.
+    """
+    log = log_fn or _noop_log
+    path = Path(path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        log("INVENTORY", f"Prices file not found: {path}", "warn")
+        return {}
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        cached = _INVENTORY_CACHE.get(path)
+        if cached and cached[0] == stamp:
+            log("INVENTORY", f"Using cached liquor inventory ({len(cached[1])} items).", "ok")
+            return cached[1]
+
+        log("INVENTORY", f"Loading liquor inventory from {path}...", "info")
+        try:
+            inventory = {}
+            with open(path, newline="", encoding="utf-8") as f:
+                # Plain reader + one pre-bound itemgetter: no per-row dict and
+                # a single C-level lookup pulls both columns we use
+                reader = csv.reader(f)
+                header = next(reader)
+                columns = itemgetter(header.index("name"), header.index("unit_price"))
+                for name, price in map(columns, reader):
+                    inventory[name.strip()] = round(float(price), 2)
+            inventory = dict(sorted(inventory.items()))
+        except Exception as e:
+            log("INVENTORY", f"Error loading inventory: {e}", "warn")
+            return {}
+        log("INVENTORY", f"Loaded {len(inventory)} liquor items with pricing.", "ok")
+        _INVENTORY_CACHE[path] = (stamp, inventory)
+        return inventory
+
+
+def inventory_stamp(path=PRICES_CSV):
+    """Return the (st_mtime_ns, st_size) stamp of the table load_liquor_inventory()
+    last parsed from path, or None if none is loaded. A cheap fingerprint for
+    cache keys."""
+    with _CACHE_LOCK:
+        cached = _INVENTORY_CACHE.get(Path(path))
+    return cached[0] if cached else None
@@ -0,0 +1,29 @@
+"""
+JSON Codec - orjson-backed encode/decode shared by the file-backed modules.
+===========================================================================
+MemoryManager and the Party Planner's history read and write JSON / JSONL
+through these two helpers. orjson (an optional C encoder/decoder) is used
+when installed; stdlib json is the fallback, with matching output.
+
+Decode errors are json.JSONDecodeError either way, since
+orjson.JSONDecodeError subclasses it.
+"""
+
+import json
+
+try:
+    import orjson  # optional C encoder/decoder; stdlib json is the fallback
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse JSON from str or UTF-8 bytes."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def json_dumps(obj, indent=False) -> bytes:
+    """Serialise to UTF-8 JSON bytes (non-ASCII kept as-is, like ensure_ascii=False)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
@@ -2,7 +2,8 @@
 Memory Manager - Shared hybrid memory system for Patterson Park Patio Bar agents.
 ==================================================================================
 Provides a MemoryManager class that:
-  - Stores categorized key insights in bar_memory.json
+  - Stores categorized key insights in bar_memory.json, with new writes appended
+    to a bar_memory.log op log that is folded back in every COMPACT_EVERY_OPS
   - Extracts new insights from conversation turns via a lightweight Gemini Flash call
   - Deduplicates and auto-prunes old entries
   - Injects a compact memory context block into agent prompts
@@ -12,14 +13,20 @@ so insights flow across agents.
 """
 
 import json
+import os
+import re
 import datetime
 import threading
+from collections import Counter
 from pathlib import Path
 from google import genai
 from google.genai import types
 
+from json_codec import json_dumps, json_loads
+from response_cache import ResponseCache
+
 MEMORY_FILE = Path(__file__).parent / "bar_memory.json"
-EXTRACTION_MODEL = "gemini-pro-latest"
+EXTRACTION_MODEL = "gemini-flash-latest"
 VALID_CATEGORIES = [
     "owner_preferences",
     "approved_decisions",
@@ -28,6 +35,54 @@ VALID_CATEGORIES = [
     "event_history",
 ]
 MAX_ENTRIES_PER_CATEGORY_IN_PROMPT = 5
+# Constrains the extraction reply to a JSON array of entries (no prose, no fences)
+EXTRACTION_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "category": {"type": "STRING", "enum": VALID_CATEGORIES},
+            "content": {"type": "STRING"},
+            "confidence": {"type": "STRING", "enum": ["high", "medium"]},
+        },
+        "required": ["category", "content"],
+    },
+}
+MAX_RESPONSE_CHARS_FOR_EXTRACTION = 1500
+
+# Fixed instructions go in system_instruction, identical on every call; the
+# per-turn memory summary and exchange are sent as separate user parts
+_EXTRACTION_INSTRUCTION = """You are a memory extraction system for a bar management AI assistant.
+Analyze the conversation exchange between the bar owner and AI assistant.
+Extract ONLY genuinely new, important insights that should be remembered long-term.
+
+RULES:
+- Only extract CONCRETE facts, decisions, or preferences — not vague chitchat.
+- Each entry must be a single concise sentence (under 20 words).
+- If the owner explicitly approved or rejected something, categorize it correctly.
+- If nothing new or noteworthy was said, return an empty list.
+- Do NOT duplicate anything already in CURRENT MEMORY.
+
+Each entry has:
+- "category": one of ["owner_preferences", "approved_decisions", "rejected_ideas", "operational_notes", "event_history"]
+- "content": the concise insight text
+- "confidence": "high" if owner explicitly stated it, "medium" if inferred
+
+Example output:
+[{"category": "owner_preferences", "content": "Prefers craft beer over imports", "confidence": "high"}]
+
+If nothing new to extract, return: []"""
+
+_EXTRACTION_CONFIG = types.GenerateContentConfig(
+    system_instruction=_EXTRACTION_INSTRUCTION,
+    temperature=0.1,
+    response_mime_type="application/json",
+    response_schema=EXTRACTION_SCHEMA,
+)
+# A whole reply wrapped in a ``` / ```json fence; group 1 is the body
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*\n?(.*?)\n?\s*```\s*$", re.DOTALL)
+EXTRACTION_CACHE_TTL_SECONDS = 7 * 24 * 3600  # same exchange -> same extraction for a week
+COMPACT_EVERY_OPS = 50  # op-log records allowed before bar_memory.json is rewritten
 
 
 def _noop_log(category, message, level="info"):
@@ -38,43 +93,127 @@ def _noop_log(category, message, level="info"):
 class MemoryManager:
     """Thread-safe manager for shared agent memory backed by bar_memory.json."""
 
-    def __init__(self, api_key, log_fn=None, memory_path=None):
+    def __init__(self, api_key, log_fn=None, memory_path=None, client=None):
         self.log = log_fn or _noop_log
         self.memory_path = Path(memory_path) if memory_path else MEMORY_FILE
-        self.log("MEMORY", f"Initialising genai.Client for extraction model...", "info")
-        self.client = genai.Client(api_key=api_key)
+        if client is not None:
+            self.log("MEMORY", "Using shared genai.Client for extraction model.", "info")
+            self.client = client
+        else:
+            self.log("MEMORY", f"Initialising genai.Client for extraction model...", "info")
+            self.client = genai.Client(api_key=api_key)
         self._lock = threading.Lock()
+        self._oplog_path = self.memory_path.with_suffix(".log")
+        self._pending_ops = 0  # records in the op log not yet folded into the JSON
+        self._ctx_cache = None  # rendered get_memory_context(); None = rebuild on next read
         self.memory = self.load_memory()
+        # (user message, AI response) -> extracted entries JSON, next to the memory file
+        self._extraction_cache = ResponseCache(
+            log_fn=self.log,
+            cache_path=self.memory_path.with_suffix(".cache.db"),
+            ttl=EXTRACTION_CACHE_TTL_SECONDS,
+        )
+        # Normalized content -> count over active entries, kept in step with
+        # stores/prunes so dedup never rescans the whole memory
+        self._existing_norm = Counter(
+            self._normalize(e["content"])
+            for cat in VALID_CATEGORIES
+            for e in self.memory.get("categories", {}).get(cat, [])
+        )
+        # Oldest active "created" stamp: prune is a no-op unless this is past the cutoff
+        self._oldest_created = self._min_created()
         self.log("MEMORY", f"MemoryManager ready. File: {self.memory_path}", "ok")
 
     # -------------------------------------------------------------------
     # Persistence
     # -------------------------------------------------------------------
     def load_memory(self) -> dict:
-        """Load memory from disk, or create an empty structure."""
+        """Load the memory snapshot from disk (or an empty structure), then
+        replay any op-log records written since it was last compacted."""
         self.log("MEMORY", f"Loading memory from {self.memory_path}...", "info")
+        data = None
         if self.memory_path.exists():
             try:
-                with open(self.memory_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = json_loads(self.memory_path.read_bytes())
                 total = sum(len(data.get("categories", {}).get(c, [])) for c in VALID_CATEGORIES)
                 self.log("MEMORY", f"Loaded {total} active memory entries.", "ok")
-                return data
             except (json.JSONDecodeError, KeyError) as e:
                 self.log("MEMORY", f"Error loading memory: {e} — creating fresh.", "warn")
 
-        self.log("MEMORY", "No memory file found — creating empty structure.", "info")
-        return self._empty_memory()
+        if data is None:
+            self.log("MEMORY", "No memory file found — creating empty structure.", "info")
+            data = self._empty_memory()
+        self._pending_ops = self._replay_oplog(data)
+        return data
 
     def save_memory(self) -> None:
-        """Persist current memory to disk (thread-safe)."""
+        """Compact: atomically rewrite bar_memory.json and clear the op log (thread-safe)."""
         with self._lock:
-            self.memory["last_updated"] = datetime.datetime.now().isoformat()
-            self.memory_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.memory_path, "w", encoding="utf-8") as f:
-                json.dump(self.memory, f, indent=2, ensure_ascii=False)
-            total = sum(len(self.memory["categories"].get(c, [])) for c in VALID_CATEGORIES)
-            self.log("MEMORY", f"Memory saved — {total} active entries.", "ok")
+            self._write_snapshot()
+
+    def _write_snapshot(self, now: str = None) -> None:
+        """Write the full snapshot, then truncate the op log (lock held).
+
+        now: the caller's ISO timestamp for last_updated, if it already has one.
+        """
+        self.memory["last_updated"] = now or datetime.datetime.now().isoformat()
+        self.memory_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.memory_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(json_dumps(self.memory, indent=True))
+        os.replace(tmp_path, self.memory_path)
+        # A crash before this truncate just replays ops the snapshot already
+        # holds, which _apply_op skips
+        open(self._oplog_path, "w").close()
+        self._pending_ops = 0
+        total = sum(len(self.memory["categories"].get(c, [])) for c in VALID_CATEGORIES)
+        self.log("MEMORY", f"Memory saved — {total} active entries.", "ok")
+
+    def _append_ops(self, records: list) -> None:
+        """Append op records to bar_memory.log (lock held); compact when enough pile up."""
+        if not records:
+            return
+        self._ctx_cache = None  # every store/archive passes through here
+        self.memory["last_updated"] = records[-1]["ts"]
+        with open(self._oplog_path, "ab") as f:
+            f.write(b"".join(json_dumps(r) + b"\n" for r in records))
+        self._pending_ops += len(records)
+        self.log("MEMORY", f"Logged {len(records)} memory op(s) — {self._pending_ops} pending compaction.", "info")
+        if self._pending_ops >= COMPACT_EVERY_OPS:
+            self._write_snapshot(records[-1]["ts"])
+
+    def _replay_oplog(self, data: dict) -> int:
+        """Apply bar_memory.log records to a freshly loaded snapshot."""
+        if not self._oplog_path.exists():
+            return 0
+        replayed = 0
+        with open(self._oplog_path, "rb") as f:
+            for line in f:
+                try:
+                    op = json_loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from an interrupted write
+                self._apply_op(data, op)
+                replayed += 1
+        if replayed:
+            self.log("MEMORY", f"Replayed {replayed} op-log records from {self._oplog_path}.", "ok")
+        return replayed
+
+    @staticmethod
+    def _apply_op(data: dict, op: dict) -> None:
+        """Apply one op record; idempotent so a snapshot that already holds it is unchanged."""
+        entry = op["entry"]
+        entries = data.setdefault("categories", {}).setdefault(op["cat"], [])
+        key = (entry.get("id"), entry.get("created"))
+        if op["op"] == "add":
+            if not any((e.get("id"), e.get("created")) == key for e in entries):
+                entries.append(entry)
+        elif op["op"] == "archive":
+            for i, e in enumerate(entries):
+                if (e.get("id"), e.get("created")) == key:
+                    del entries[i]
+                    data.setdefault("archive", []).append(entry)
+                    break
+        data["last_updated"] = op.get("ts", data.get("last_updated"))
 
     @staticmethod
     def _empty_memory() -> dict:
@@ -95,8 +234,15 @@ class MemoryManager:
         to keep token usage predictable (~500-800 tokens).
         """
         with self._lock:
-            categories = self.memory.get("categories", {})
+            if self._ctx_cache is None:
+                self._ctx_cache = self._build_memory_context()
+            else:
+                self.log("MEMORY", f"Memory context unchanged — reusing {len(self._ctx_cache)} chars", "info")
+            return self._ctx_cache
 
+    def _build_memory_context(self) -> str:
+        """Render the memory context block (lock held)."""
+        categories = self.memory.get("categories", {})
         total_entries = sum(len(categories.get(c, [])) for c in VALID_CATEGORIES)
         if total_entries == 0:
             self.log("MEMORY", "No memory entries to inject.", "info")
@@ -133,7 +279,8 @@ class MemoryManager:
     def extract_and_store(self, user_message: str, ai_response: str, source_agent: str) -> None:
         """Extract insights from a conversation turn and persist them.
 
-        Called from a background thread AFTER the main response is displayed.
+        Blocking; call it from a background thread AFTER the main response is
+        displayed (the GUI's memory worker does).
         """
         self.log("MEMORY", f"Starting extraction for '{source_agent}' turn...", "info")
 
@@ -168,6 +315,7 @@ class MemoryManager:
         # Store
         now = datetime.datetime.now().isoformat()
         with self._lock:
+            records = []
             for entry in unique_entries:
                 cat = entry["category"]
                 mem_entry = {
@@ -178,67 +326,56 @@ class MemoryManager:
                     "confidence": entry.get("confidence", "medium"),
                 }
                 self.memory["categories"][cat].append(mem_entry)
+                self._existing_norm[self._normalize(entry["content"])] += 1
+                if self._oldest_created is None:
+                    self._oldest_created = now
+                records.append({"op": "add", "cat": cat, "entry": mem_entry, "ts": now})
                 self.log("MEMORY", f"Stored [{cat}]: {entry['content'][:80]}", "ok")
-
-        self.save_memory()
+            self._append_ops(records)
 
         # Auto-prune after each save
-        pruned = self.prune_old_entries()
-        if pruned > 0:
-            self.save_memory()
+        self.prune_old_entries()
 
     def _call_extraction_llm(self, user_message: str, ai_response: str, current_memory_summary: str) -> list:
-        """Make a lightweight Gemini Flash call to extract new insights."""
-        extraction_prompt = f"""You are a memory extraction system for a bar management AI assistant.
-Analyze this conversation exchange between the bar owner and AI assistant.
-Extract ONLY genuinely new, important insights that should be remembered long-term.
-
-CURRENT MEMORY (do NOT re-extract anything already here):
-{current_memory_summary if current_memory_summary else "(empty — no prior memory)"}
-
-CONVERSATION EXCHANGE:
-Owner: {user_message}
-AI: {ai_response[:1500]}
-
-RULES:
-- Only extract CONCRETE facts, decisions, or preferences — not vague chitchat.
-- Each entry must be a single concise sentence (under 20 words).
-- If the owner explicitly approved or rejected something, categorize it correctly.
-- If nothing new or noteworthy was said, return an empty list.
-- Do NOT duplicate anything already in CURRENT MEMORY.
-
-Return a JSON array (and NOTHING else) of objects with these fields:
-- "category": one of ["owner_preferences", "approved_decisions", "rejected_ideas", "operational_notes", "event_history"]
-- "content": the concise insight text
-- "confidence": "high" if owner explicitly stated it, "medium" if inferred
+        """Make a lightweight Gemini Flash call to extract new insights.
 
-Example output:
-[{{"category": "owner_preferences", "content": "Prefers craft beer over imports", "confidence": "high"}}]
-
-If nothing new to extract, return: []"""
+        Results are cached per (user_message, ai_response) so a repeated
+        exchange skips the call; failed calls are not cached.
+        """
+        cache_key = ResponseCache.make_key("memory_extraction", user_message, ai_response)
+        cached = self._extraction_cache.get(cache_key)
+        if cached is not None:
+            entries = json_loads(cached)
+            self.log("MEMORY", f"Extraction cache hit — {len(entries)} candidate entries.", "info")
+            return entries
+
+        response_excerpt = ai_response[:MAX_RESPONSE_CHARS_FOR_EXTRACTION]
+        contents = types.Content(role="user", parts=[
+            types.Part(text=(
+                "CURRENT MEMORY (do NOT re-extract anything already here):\n"
+                + (current_memory_summary or "(empty — no prior memory)")
+            )),
+            types.Part(text=f"CONVERSATION EXCHANGE:\nOwner: {user_message}\nAI: {response_excerpt}"),
+        ])
 
         self.log("MEMORY", f"Calling extraction LLM ({EXTRACTION_MODEL})...", "info")
         try:
             response = self.client.models.generate_content(
                 model=EXTRACTION_MODEL,
-                contents=extraction_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.1
-                ),
+                contents=contents,
+                config=_EXTRACTION_CONFIG,
             )
             raw = response.text.strip()
 
-            # Strip markdown code fences if present
-            if raw.startswith("```"):
-                raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
-            if raw.endswith("```"):
-                raw = raw[:-3].strip()
-            if raw.startswith("json"):
-                raw = raw[4:].strip()
+            # Strip markdown code fences if present (shouldn't happen in JSON mode)
+            m = _FENCE_RE.match(raw)
+            raw = m.group(1) if m else raw
 
-            entries = json.loads(raw)
+            entries = json_loads(raw)
             self.log("MEMORY", f"Extraction returned {len(entries)} candidate entries.", "info")
-            return entries if isinstance(entries, list) else []
+            entries = entries if isinstance(entries, list) else []
+            self._extraction_cache.set(cache_key, json_dumps(entries).decode("utf-8"))
+            return entries
         except json.JSONDecodeError as e:
             self.log("MEMORY", f"Extraction LLM returned invalid JSON: {e}", "warn")
             self.log("MEMORY", f"Raw response: {response.text[:200] if response else '(none)'}", "warn")
@@ -250,25 +387,43 @@ If nothing new to extract, return: []"""
     # -------------------------------------------------------------------
     # Deduplication and ID generation
     # -------------------------------------------------------------------
+    @staticmethod
+    def _normalize(content: str) -> str:
+        return content.lower().strip().rstrip(".")
+
     def _deduplicate(self, new_entries: list) -> list:
         """Remove entries whose content matches existing entries (case-insensitive)."""
         unique = []
+        seen = set()  # prevent duplicates within batch
         with self._lock:
-            existing_contents = set()
-            for cat in VALID_CATEGORIES:
-                for entry in self.memory["categories"].get(cat, []):
-                    existing_contents.add(entry["content"].lower().strip().rstrip("."))
-
-        for entry in new_entries:
-            normalized = entry["content"].lower().strip().rstrip(".")
-            if normalized not in existing_contents:
-                unique.append(entry)
-                existing_contents.add(normalized)  # prevent duplicates within batch
-            else:
-                self.log("MEMORY", f"Dedup: skipping '{entry['content'][:60]}'", "info")
+            existing = self._existing_norm
+            for entry in new_entries:
+                normalized = self._normalize(entry["content"])
+                if normalized not in existing and normalized not in seen:
+                    unique.append(entry)
+                    seen.add(normalized)
+                else:
+                    self.log("MEMORY", f"Dedup: skipping '{entry['content'][:60]}'", "info")
 
         return unique
 
+    def _min_created(self):
+        """Oldest "created" stamp among active entries, or None if empty (lock held)."""
+        return min(
+            (e.get("created", "") for cat in VALID_CATEGORIES
+             for e in self.memory.get("categories", {}).get(cat, [])),
+            default=None,
+        )
+
+    def _forget_norm(self, content: str) -> None:
+        """Drop one active occurrence of content from the dedup index (lock held)."""
+        normalized = self._normalize(content)
+        count = self._existing_norm.get(normalized, 0)
+        if count <= 1:
+            self._existing_norm.pop(normalized, None)
+        else:
+            self._existing_norm[normalized] = count - 1
+
     def _generate_id(self, category: str) -> str:
         """Generate a unique ID like pref_001, dec_002, etc."""
         prefix_map = {
@@ -291,10 +446,16 @@ If nothing new to extract, return: []"""
     # -------------------------------------------------------------------
     def prune_old_entries(self, max_age_days: int = 180) -> int:
         """Move entries older than max_age_days to the archive section."""
-        cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat()
+        now = datetime.datetime.now()
+        cutoff = (now - datetime.timedelta(days=max_age_days)).isoformat()
+        archived_on = now.isoformat()  # one stamp for the whole pass
         pruned_count = 0
 
         with self._lock:
+            # Runs after every store; almost always nothing is old enough
+            if self._oldest_created is None or self._oldest_created >= cutoff:
+                return 0
+            records = []
             for cat in VALID_CATEGORIES:
                 entries = self.memory["categories"].get(cat, [])
                 keep = []
@@ -302,13 +463,17 @@ If nothing new to extract, return: []"""
                     if entry.get("created", "") < cutoff:
                         archived = dict(entry)
                         archived["original_category"] = cat
-                        archived["archived_on"] = datetime.datetime.now().isoformat()
+                        archived["archived_on"] = archived_on
                         self.memory["archive"].append(archived)
+                        records.append({"op": "archive", "cat": cat, "entry": archived, "ts": archived_on})
+                        self._forget_norm(entry["content"])
                         pruned_count += 1
                         self.log("MEMORY", f"Archived old entry [{cat}]: {entry['content'][:60]}", "info")
                     else:
                         keep.append(entry)
                 self.memory["categories"][cat] = keep
+            self._append_ops(records)
+            self._oldest_created = self._min_created()
 
         if pruned_count > 0:
             self.log("MEMORY", f"Pruned {pruned_count} entries older than {max_age_days} days to archive.", "ok")
@@ -0,0 +1,68 @@
+"""
+Model Hedge - blocking Gemini call with a hedged fallback model.
+================================================================
+Used by the Party Planner and Cocktail Creator for their non-streaming
+calls. The request goes to PRIMARY_MODEL first. If it fails, or has not
+answered within HEDGE_DELAY_SECONDS, the fallback prompt is also sent to
+FALLBACK_MODEL and whichever succeeds first is returned. The loser's reply
+is discarded (its HTTP call cannot be aborted mid-flight).
+
+Takes the caller's log(category, message, level) callback for the GUI
+debug console.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from agent_errors import ErrorReply
+
+PRIMARY_MODEL = "gemini-pro-latest"
+FALLBACK_MODEL = "gemini-flash-latest"
+HEDGE_DELAY_SECONDS = 20.0  # how long the primary model gets before the fallback is fired too
+
+
+def hedged_generate(client, log, prompt, config, fallback_prompt, error_prefix):
+    """Return the first successful reply text, or an ErrorReply if both fail.
+
+    config goes to the primary model only. A prompt cache belongs to the
+    primary model, so fallback_prompt must carry the full prompt and is sent
+    without a config.
+    """
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gemini-hedge")
+    try:
+        racers = {pool.submit(_generate, client, PRIMARY_MODEL, prompt, config): PRIMARY_MODEL}
+        done, _ = wait(racers, timeout=HEDGE_DELAY_SECONDS)
+        primary = next(iter(racers))
+        if done and primary.exception() is None:
+            return _model_reply(log, primary.result(), PRIMARY_MODEL)
+        if done:
+            log("GEMINI", f"Model error: {primary.exception()} — trying {FALLBACK_MODEL}", "warn")
+            racers.clear()
+        else:
+            log("GEMINI", f"No reply after {HEDGE_DELAY_SECONDS:.0f}s — hedging with {FALLBACK_MODEL}", "warn")
+        racers[pool.submit(_generate, client, FALLBACK_MODEL, fallback_prompt, None)] = FALLBACK_MODEL
+
+        error = None
+        while racers:
+            done, _ = wait(racers, return_when=FIRST_COMPLETED)
+            for future in done:
+                model = racers.pop(future)
+                if future.exception() is None:
+                    return _model_reply(log, future.result(), model)
+                error = future.exception()
+                log("GEMINI", f"{model} error: {error}", "warn")
+        log("GEMINI", f"Model error: {error}", "err")
+        return ErrorReply(f"{error_prefix}: {error}")
+    finally:
+        pool.shutdown(wait=False)
+
+
+def _generate(client, model, prompt, config):
+    text = client.models.generate_content(model=model, contents=prompt, config=config).text
+    if text is None:
+        raise ValueError("empty response (blocked or no candidates)")
+    return text
+
+
+def _model_reply(log, text, model):
+    log("GEMINI", f"Response received from {model} — {len(text)} chars", "ok")
+    return text
@@ -1,49 +1,66 @@
 import json
 import os
+import re
+from pathlib import Path
+
+try:
+    import orjson  # optional: C encoder, several times faster than json.dump(indent=...)
+except ImportError:
+    orjson = None
 
 file_path = 'Bar_Owner_Agent/agent.ipynb'
 
+# One alternation per edit, compiled once; the group name says which fired
+EDIT_RE = re.compile(
+    r"(?P<accounts>GOOGLE_ACCOUNTS = \['personal', 'bar', 'personal_business'\])"
+    r"|(?P<goal>Your Goal: Review the raw data and generate a \"Daily Battle Plan\"\.)"
+    r"|(?P<briefing>## 📝 BRIEFING)"
+)
+ACCOUNTS_LINE = "GOOGLE_ACCOUNTS = ['personal', 'bar', 'personal_business', 'manager'] \n"
+GOAL_LINE = '        Your Goal: Review the raw data, generate a "Daily Battle Plan", and predict crowd size/strategy.\n'
+PREDICTION_LINES = [
+    "        ## 📊 CROWD PREDICTION & STRATEGY\n",
+    "        (Analyze the calendar for the next 24 hours. Look for events that drive traffic. Predict crowd size: Low/Medium/High. Recommend a strategy for staffing/inventory.)\n",
+    "        \n",
+]
+
 try:
-    with open(file_path, 'r', encoding='utf-8') as f:
-        notebook = json.load(f)
+    raw = Path(file_path).read_bytes()
+    notebook = orjson.loads(raw) if orjson else json.loads(raw)
 
     google_accounts_modified = False
     prompt_modified = False
 
+    # Every line is tested once against all three edits
     for cell in notebook['cells']:
-        if cell['cell_type'] == 'code':
-            # Modify GOOGLE_ACCOUNTS
-            new_source = []
-            for line in cell['source']:
-                if "GOOGLE_ACCOUNTS = ['personal', 'bar', 'personal_business']" in line:
-                    new_source.append("GOOGLE_ACCOUNTS = ['personal', 'bar', 'personal_business', 'manager'] 
-")
-                    google_accounts_modified = True
-                else:
-                    new_source.append(line)
-            cell['source'] = new_source
-
-            # Modify system_instruction
-            # We look for the cell containing the system prompt
-            source_text = "".join(cell['source'])
-            if 'system_instruction = """' in source_text:
-                new_source_prompt = []
-                for line in cell['source']:
-                    # Update Goal
-                    if 'Your Goal: Review the raw data and generate a "Daily Battle Plan".' in line:
-                        new_source_prompt.append('        Your Goal: Review the raw data, generate a "Daily Battle Plan", and predict crowd size/strategy.\n')
-                    # Insert Prediction Section
-                    elif '## 📝 BRIEFING' in line:
-                        new_source_prompt.append("        ## 📊 CROWD PREDICTION & STRATEGY\n")
-                        new_source_prompt.append("        (Analyze the calendar for the next 24 hours. Look for events that drive traffic. Predict crowd size: Low/Medium/High. Recommend a strategy for staffing/inventory.)\n")
-                        new_source_prompt.append("        \n")
-                        new_source_prompt.append(line)
-                    else:
-                        new_source_prompt.append(line)
-                
-                if new_source_prompt != cell['source']:
-                    cell['source'] = new_source_prompt
-                    prompt_modified = True
+        if cell['cell_type'] != 'code':
+            continue
+        source = cell['source']
+        new_source = []
+        changed = False
+        for line in source:
+            m = EDIT_RE.search(line)
+            if m is None:
+                new_source.append(line)
+                continue
+            changed = True
+            if m.lastgroup == 'accounts':
+                # Modify GOOGLE_ACCOUNTS
+                new_source.append(ACCOUNTS_LINE)
+                google_accounts_modified = True
+            elif m.lastgroup == 'goal':
+                # Update Goal
+                new_source.append(GOAL_LINE)
+                prompt_modified = True
+            else:
+                # Insert Prediction Section
+                new_source.extend(PREDICTION_LINES)
+                new_source.append(line)
+                prompt_modified = True
+        if changed:
+            source[:] = new_source
+        if google_accounts_modified and prompt_modified:
+            break  # the accounts line and the prompt each live in a single cell
 
     if google_accounts_modified:
         print("Successfully modified GOOGLE_ACCOUNTS.")
@@ -55,8 +72,12 @@ try:
     else:
         print("WARNING: Could not find system_instruction to modify.")
 
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(notebook, f, indent=1)
+    if orjson:
+        Path(file_path).write_bytes(orjson.dumps(notebook, option=orjson.OPT_INDENT_2))
+    else:
+        # Compact separators: Jupyter reads it fine and re-indents on its next save
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(notebook, f, separators=(',', ':'), ensure_ascii=False)
 
 except Exception as e:
     print(f"Error: {e}")
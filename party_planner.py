@@ -8,13 +8,21 @@ Accepts an optional log_fn(category, message, level) callback for the GUI debug
 """
 
 import os
-import csv
 import datetime
 import json
+import re
+import sys
+import threading
 from pathlib import Path
 from google import genai
 from google.genai import types
 
+from agent_errors import ErrorReply
+from inventory import LIQUEUR_NAMES, inventory_stamp, load_liquor_inventory
+from json_codec import json_dumps, json_loads
+from model_hedge import hedged_generate
+from prompt_cache import PROMPT_CACHE_TTL_SECONDS, PromptCache
+
 # Import your secrets
 try:
     import secrets_config
@@ -22,101 +30,13 @@ except ImportError:
     print("ERROR: secrets_config.py not found. Please create it.")
     secrets_config = None
 
-HISTORY_FILE = Path(__file__).parent / "party_history.json"
-PRICES_CSV = Path(__file__).parent / "context_data" / "liquor_prices.csv"
-
-
-def _noop_log(category, message, level="info"):
-    """Default no-op logger used when no GUI callback is provided."""
-    pass
-
-
-class PartyPlanningAgent:
-    def __init__(self, api_key, log_fn=None, memory_manager=None, calendar_events=None):
-        self.log = log_fn or _noop_log
-        self.memory_manager = memory_manager
-        self.calendar_events = calendar_events or []
-        self.log("PARTY", "Initialising genai.Client...", "info")
-        self.client = genai.Client(api_key=api_key)
-        self.log("PARTY", "genai.Client ready.", "ok")
-        self.log("PARTY", f"History file: {HISTORY_FILE}", "info")
-        if self.memory_manager:
-            self.log("PARTY", "Shared MemoryManager attached.", "ok")
-        if self.calendar_events:
-            self.log("PARTY", f"Google Calendar loaded: {len(self.calendar_events)} events.", "ok")
-        else:
-            self.log("PARTY", "No Google Calendar data provided.", "warn")
-        self.liquor_inventory = self._load_liquor_inventory()
-        self.history = self.load_history()
-
-    def _load_liquor_inventory(self):
-        """Load liquor names and per-ounce costs from liquor_prices.csv."""
-        if not PRICES_CSV.exists():
-            self.log("INVENTORY", f"Prices file not found: {PRICES_CSV}", "warn")
-            return {}
-
-        self.log("INVENTORY", f"Loading liquor inventory from {PRICES_CSV}...", "info")
-        try:
-            inventory = {}
-            with open(PRICES_CSV, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    name = row["name"].strip()
-                    price = round(float(row["unit_price"]), 2)
-                    inventory[name] = price
-            self.log("INVENTORY", f"Loaded {len(inventory)} liquor items with pricing.", "ok")
-            return inventory
-        except Exception as e:
-            self.log("INVENTORY", f"Error loading inventory: {e}", "warn")
-            return {}
-
-    def _get_cocktail_pricing_context(self):
-        """Build a prompt-ready block with liquor cost-per-ounce data and cocktail pricing rules."""
-        if not self.liquor_inventory:
-            return ""
-
-        # Group inventory into categories for the LLM
-        well = []
-        mid_tier = []
-        premium = []
-        liqueurs = []
-
-        liqueur_names = {
-            "aperol", "campari", "st-germain", "kahlua l",
-            "grand marnier", "licor 43", "luxardo", "absente",
-            "amaro nonino", "fernet branca", "chila orchata",
-            "tuaca", "jagermeister", "goldschlager", "fireball",
-            "rumpleminze", "skrewball", "emmet's irish cream",
-            "lillet", "dolin sweet vermouth", "vermouth dry noily prat",
-            "william price coffee liqueur", "william price limoncello",
-        }
-
-        for name, cost_oz in sorted(self.liquor_inventory.items()):
-            entry = f"  {name}: ${cost_oz:.2f}/oz"
-            lower = name.lower()
-            if lower.startswith("well ") or lower.startswith("(well)"):
-                well.append(entry)
-            elif "liqueur" in lower or lower in liqueur_names:
-                liqueurs.append(entry)
-            elif cost_oz >= 1.50:
-                premium.append(entry)
-            else:
-                mid_tier.append(entry)
+HISTORY_FILE = Path(__file__).parent / "party_history.jsonl"  # one JSON entry per line
+LEGACY_HISTORY_FILE = Path(__file__).parent / "party_history.json"
+ARCHIVE_HISTORY_FILE = Path(__file__).parent / "party_history_archive.jsonl"
+MAX_HISTORY_ENTRIES = 200  # entries kept live (100 turns); prompts only use the last 10
+COMPACT_HISTORY_AT = 2 * MAX_HISTORY_ENTRIES  # file size (entries) that triggers a compaction
 
-        lines = [
-            "\n--- LIQUOR INVENTORY & COST PER OUNCE (from Patterson Inventory) ---",
-            "\nWELL LIQUORS (avoid for specialty cocktails):"
-        ]
-        lines.extend(well)
-        lines.append("\nMID-TIER LIQUORS (preferred for specialty cocktails — a step up from well):")
-        lines.extend(mid_tier)
-        lines.append("\nPREMIUM LIQUORS (use sparingly, for feature cocktails only):")
-        lines.extend(premium)
-        lines.append("\nLIQUEURS & SPECIALTY SPIRITS:")
-        lines.extend(liqueurs)
-        lines.append("\n--- END INVENTORY ---")
-
-        lines.append("""
+_COCKTAIL_RULES_BLOCK = """
 --- COCKTAIL PRICING RULES (MANDATORY) ---
 When creating specialty cocktails for events, you MUST follow these rules:
 
@@ -155,44 +75,331 @@ When creating specialty cocktails for events, you MUST follow these rules:
 6. Each cocktail MUST have specific measurements in ounces, specific ingredient names,
    itemized costs per ingredient, a total COGS, and a final menu price.
 --- END PRICING RULES ---
-""")
+"""
+
+# --- PROMPT TEXT ---
+# Fixed parts of the plan prompts; the per-call context is spliced in between
+# them with a single "".join in the _build_*_prompt methods.
+_SEASONAL_PROMPT_HEAD = """
+You are the owner and creative director of Patterson Park Patio Bar in Houston, Texas.
+We need a forward-looking seasonal strategy.
+
+"""
+
+_SEASONAL_PROMPT_BODY = """
+
+IMPORTANT: Review the Google Calendar events below carefully. These are REAL scheduled events,
+bookings, and commitments already on our calendar. Your seasonal plan MUST:
+- Work around any existing bookings or reservations shown in the calendar.
+- Build on or enhance any events already scheduled (don't conflict with them).
+- Reference specific calendar items when relevant (e.g., "Since we already have [X] booked on [date]...").
+- Identify open dates that are good opportunities for new events.
+
+Please also research upcoming seasonal events, holidays, festivals, and major sporting events relevant to Houston and our demographic (23-39 year olds).
+
+Create a **Seasonal Theme Plan** covering the next 3 months.
+For EACH month, provide:
+1. **Theme Name:** Catchy title.
+2. **Key Event:** One major event to throw a party for (e.g., Super Bowl, St. Patrick's, Mardi Gras, First Day of Spring).
+3. **Decorations:** Specific, actionable decor ideas.
+4. **Music Vibe:** Genres or specific artists.
+5. **Seasonal Cocktails:** Follow the COCKTAIL PRICING RULES above exactly. Use ONLY liquors from the inventory list provided (with their real costs per ounce). For each event, create the appropriate number of specialty cocktails with full recipes, itemized ingredient costs, total COGS, and a menu price between $10-$14 targeting 15% cost of goods. Use mid-tier liquors (a step above well) as the base spirits.
+6. **Weekly events** or promotions to keep the momentum going. Focus on the latest streaming entertainment or social media trends. Be creative!
+
+Also, list any other smaller opportunities (holidays, festivals) we should be aware of.
+Flag any scheduling conflicts with existing calendar events.
+"""
+
+_REFINE_PROMPT_HEAD = """
+You are the creative director of Patterson Park Patio Bar.
+
+"""
+
+_REFINE_PROMPT_BODY = """
+
+Below are the Current Seasonal Plan you proposed and the owner's feedback on it.
+Please UPDATE the plan to incorporate this feedback.
+Keep the structure (Seasonal Theme Plan for next 3 months) but modify the specific sections requested.
+If the feedback implies a total change of direction, feel free to rewrite the relevant parts entirely.
+When creating or modifying cocktails, you MUST follow the COCKTAIL PRICING RULES above — use specific
+ingredients from the inventory with real costs, itemize all ingredient costs, calculate total COGS,
+and set menu prices between $10-$14 targeting 15% cost of goods. Use mid-tier liquors as the base.
+"""
+
+_PATCH_PROMPT_BODY = """
+
+Below are the sections of the Current Seasonal Plan you proposed (each tagged
+with its [id]) and the owner's feedback on it. Update the plan to incorporate
+the feedback, changing only the sections that need it.
+When creating or modifying cocktails, you MUST follow the COCKTAIL PRICING RULES above — use specific
+ingredients from the inventory with real costs, itemize all ingredient costs, calculate total COGS,
+and set menu prices between $10-$14 targeting 15% cost of goods. Use mid-tier liquors as the base.
+
+Respond with ONLY a JSON object of this shape (omit empty lists):
+{"replace": [{"id": "s2", "title": "## Heading", "body": "new markdown body"}],
+  "add": [{"after": "s3", "title": "## Heading", "body": "markdown body"}],
+  "remove": ["s5"]}
+Titles are full markdown heading lines. Use "after": null to add at the top.
+"""
+
+_FEEDBACK_LEAD = '\nThe user (owner) has provided the following feedback:\n"'
+
+# Markdown headings that delimit plan sections for patch-style refinement
+_SECTION_HEADING = re.compile(r"^#{1,4} .*$", re.MULTILINE)
+
+
+def _noop_log(category, message, level="info"):
+    """Default no-op logger used when no GUI callback is provided."""
+    pass
+
+
+def split_plan_sections(plan_text):
+    """Split a markdown plan into [{"id", "title", "body"}] on its headings.
+    Text before the first heading becomes an untitled leading section."""
+    sections = []
+    starts = [m.start() for m in _SECTION_HEADING.finditer(plan_text)]
+    if not starts or starts[0] > 0:
+        starts.insert(0, 0)
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(plan_text)
+        chunk = plan_text[start:end]
+        title, sep, body = chunk.partition("\n")
+        if not _SECTION_HEADING.match(title):
+            title, body = "", chunk
+        sections.append({"id": f"s{i + 1}", "title": title, "body": body.strip("\n")})
+    return sections
+
+
+def join_plan_sections(sections):
+    """Reassemble plan sections into markdown text."""
+    parts = []
+    for section in sections:
+        parts.append(f"{section['title']}\n{section['body']}" if section["title"] else section["body"])
+    return "\n\n".join(parts)
+
+
+def apply_plan_patch(sections, patch):
+    """Apply a {"replace", "add", "remove"} patch from the model to sections.
+    Untouched sections are kept byte-for-byte; ids are renumbered afterwards."""
+    replaced = {r["id"]: r for r in patch.get("replace", [])}
+    removed = set(patch.get("remove", []))
+    added = {}
+    for a in patch.get("add", []):
+        added.setdefault(a.get("after"), []).append(a)
+
+    result = list(added.get(None, []))  # additions with no anchor go first
+    for section in sections:
+        if section["id"] not in removed:
+            edit = replaced.get(section["id"])
+            if edit:
+                section = {**section, "title": edit.get("title", section["title"]), "body": edit["body"]}
+            result.append(section)
+        result.extend(added.get(section["id"], []))
+    return [
+        {"id": f"s{i + 1}", "title": sec.get("title", ""), "body": sec.get("body", "").strip("\n")}
+        for i, sec in enumerate(result)
+    ]
+
+
+def _classify_inventory(inventory):
+    """Split {name: cost_oz} into (well, mid_tier, premium, liqueurs) prompt lines."""
+    # Group inventory into categories for the LLM
+    well = []
+    mid_tier = []
+    premium = []
+    liqueurs = []
+
+    for name, cost_oz in inventory.items():  # already in name order
+        entry = f"  {name}: ${cost_oz:.2f}/oz"
+        lower = name.lower()
+        if lower.startswith("well ") or lower.startswith("(well)"):
+            well.append(entry)
+        elif "liqueur" in lower or lower in LIQUEUR_NAMES:
+            liqueurs.append(entry)
+        elif cost_oz >= 1.50:
+            premium.append(entry)
+        else:
+            mid_tier.append(entry)
+    return well, mid_tier, premium, liqueurs
+
+
+class PartyPlanningAgent:
+    def __init__(self, api_key, log_fn=None, memory_manager=None, calendar_events=None, client=None):
+        self.log = log_fn or _noop_log
+        # Lets per-turn log lines skip building their f-strings when nobody listens
+        self._log_enabled = log_fn is not None
+        self.memory_manager = memory_manager
+        self.calendar_events = calendar_events or []
+        self._api_key = api_key
+        self._client = client  # built on first model call when not injected
+        self._client_lock = threading.Lock()
+        if client is not None:
+            self.log("PARTY", "Using shared genai.Client.", "ok")
+        self.log("PARTY", f"History file: {HISTORY_FILE}", "info")
+        if self.memory_manager:
+            self.log("PARTY", "Shared MemoryManager attached.", "ok")
+        if self.calendar_events:
+            self.log("PARTY", f"Google Calendar loaded: {len(self.calendar_events)} events.", "ok")
+        else:
+            self.log("PARTY", "No Google Calendar data provided.", "warn")
+        self.liquor_inventory = self._load_liquor_inventory()
+        self.inventory_stamp = inventory_stamp()  # fingerprint of liquor_inventory for cache keys
+        self._cocktail_context = None  # built on first use; the inventory never changes
+        self._history = None  # parsed on first use; unused when memory_manager is set
+        self._history_file_ready = False  # see _prepare_history_file()
+        self._file_entries = None  # lines in HISTORY_FILE, counted on first load / save
+        self._prompt_caches = {}  # prompt head -> PromptCache, for heads whose upload succeeded
+
+    @property
+    def client(self):
+        """The genai.Client passed in, or one created on first access."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self.log("PARTY", "Initialising genai.Client...", "info")
+                    self._client = genai.Client(api_key=self._api_key)
+                    self.log("PARTY", "genai.Client ready.", "ok")
+        return self._client
+
+    @property
+    def history(self):
+        """Raw conversation history, loaded from HISTORY_FILE on first access."""
+        if self._history is None:
+            self._history = self.load_history()
+        return self._history
+
+    def _load_liquor_inventory(self):
+        """Load liquor names and per-ounce costs from liquor_prices.csv.
+
+        Also files each item into its pricing-context bucket as a ready-made
+        prompt line, so prompt builds never re-classify the inventory.
+        """
+        inventory = load_liquor_inventory(log_fn=self.log)
+        (self._well_lines, self._mid_lines,
+         self._premium_lines, self._liqueur_lines) = _classify_inventory(inventory)
+        return inventory
+
+    def _get_cocktail_pricing_context(self):
+        """Return the prompt-ready liquor cost + cocktail pricing rules block."""
+        if self._cocktail_context is None:
+            self._cocktail_context = self._build_cocktail_pricing_context()
+        return self._cocktail_context
+
+    def _build_cocktail_pricing_context(self):
+        """Build a prompt-ready block with liquor cost-per-ounce data and cocktail pricing rules."""
+        if not self.liquor_inventory:
+            return ""
+
+        lines = [
+            "\n--- LIQUOR INVENTORY & COST PER OUNCE (from Patterson Inventory) ---",
+            "\nWELL LIQUORS (avoid for specialty cocktails):"
+        ]
+        lines.extend(self._well_lines)
+        lines.append("\nMID-TIER LIQUORS (preferred for specialty cocktails — a step up from well):")
+        lines.extend(self._mid_lines)
+        lines.append("\nPREMIUM LIQUORS (use sparingly, for feature cocktails only):")
+        lines.extend(self._premium_lines)
+        lines.append("\nLIQUEURS & SPECIALTY SPIRITS:")
+        lines.extend(self._liqueur_lines)
+        lines.append("\n--- END INVENTORY ---")
+
+        lines.append(_COCKTAIL_RULES_BLOCK)
         return "\n".join(lines)
 
     def load_history(self):
         self.log("HISTORY", f"Loading history from {HISTORY_FILE}...", "info")
-        if HISTORY_FILE.exists():
+        # EAFP: one open() instead of an exists() stat before it
+        try:
+            raw = HISTORY_FILE.read_bytes()
+        except FileNotFoundError:
+            raw = self._migrate_legacy_history()
+            if raw is None:
+                self.log("HISTORY", "No history file found — starting fresh.", "info")
+                self._file_entries = 0
+                return []
+        data = self._parse_history(raw)
+        self._file_entries = len(data)
+        if len(data) > COMPACT_HISTORY_AT:
+            data = self._compact_history(data)
+        data = data[-MAX_HISTORY_ENTRIES:]
+        self.log("HISTORY", f"Loaded {len(data)} entries from history.", "ok")
+        return data
+
+    def _parse_history(self, raw):
+        """Decode JSONL bytes into entries, skipping lines that don't parse."""
+        data = []
+        for lineno, line in enumerate(raw.splitlines(), 1):
+            if not line.strip():
+                continue
             try:
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self.log("HISTORY", f"Loaded {len(data)} entries from history.", "ok")
-                return data
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                data.append(json_loads(line))
             except json.JSONDecodeError as e:
-                self.log("HISTORY", f"JSON decode error: {e} — starting fresh.", "warn")
-                return []
-        self.log("HISTORY", "No history file found — starting fresh.", "info")
-        return []
-
-    def save_interaction(self, user_input, ai_response):
-        timestamp = datetime.datetime.now().isoformat()
-        entry = {
-            "timestamp": timestamp,
-            "role": "user",
-            "content": user_input
-        }
-        response_entry = {
-            "timestamp": timestamp,
-            "role": "model",
-            "content": ai_response
-        }
-        self.history.append(entry)
-        self.history.append(response_entry)
+                # Most likely a line torn by a crash mid-append
+                self.log("HISTORY", f"Skipping bad line {lineno}: {e}", "warn")
+        return data
 
+    def _migrate_legacy_history(self):
+        """One-time conversion of the old whole-file party_history.json.
+        Returns the JSONL bytes written, or None if there was nothing to migrate."""
+        try:
+            entries = json_loads(LEGACY_HISTORY_FILE.read_bytes())
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            self.log("HISTORY", f"Legacy history unreadable ({e}) — not migrated.", "warn")
+            return None
+        raw = b"".join(json_dumps(entry) + b"\n" for entry in entries)
+        HISTORY_FILE.write_bytes(raw)
+        self.log("HISTORY", f"Migrated {len(entries)} entries from {LEGACY_HISTORY_FILE.name}.", "ok")
+        return raw
+
+    def _compact_history(self, data):
+        """Move all but the newest MAX_HISTORY_ENTRIES to the archive file and
+        rewrite HISTORY_FILE with the rest. Returns the kept entries."""
+        archived, kept = data[:-MAX_HISTORY_ENTRIES], data[-MAX_HISTORY_ENTRIES:]
+        with open(ARCHIVE_HISTORY_FILE, "ab") as f:
+            f.write(b"".join(json_dumps(entry) + b"\n" for entry in archived))
+        tmp_path = HISTORY_FILE.with_suffix(".jsonl.tmp")
+        tmp_path.write_bytes(b"".join(json_dumps(entry) + b"\n" for entry in kept))
+        os.replace(tmp_path, HISTORY_FILE)
+        self._file_entries = len(kept)
+        self.log("HISTORY", f"Archived {len(archived)} old entries to {ARCHIVE_HISTORY_FILE.name}.", "ok")
+        return kept
+
+    def _prepare_history_file(self):
+        """First-save setup, done once per agent rather than every turn."""
         # Ensure directory exists
         HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        if self._file_entries is None:
+            # Not loaded yet: count lines (no parse) so save_interaction()
+            # knows when the file is due for compaction
+            try:
+                self._file_entries = HISTORY_FILE.read_bytes().count(b"\n")
+            except FileNotFoundError:
+                # A legacy file must be converted before the .jsonl is created
+                raw = self._migrate_legacy_history()
+                self._file_entries = raw.count(b"\n") if raw else 0
+        self._history_file_ready = True
 
-        self.log("HISTORY", f"Saving {len(self.history)} entries to {HISTORY_FILE}...", "info")
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.history, f, indent=2)
+    def save_interaction(self, user_input, ai_response):
+        timestamp = datetime.datetime.now().isoformat()
+        entries = (
+            {"timestamp": timestamp, "role": "user", "content": user_input},
+            {"timestamp": timestamp, "role": "model", "content": ai_response},
+        )
+        if self._history is not None:
+            self._history.extend(entries)
+            del self._history[:-MAX_HISTORY_ENTRIES]
+        if not self._history_file_ready:
+            self._prepare_history_file()
+
+        # Append-only: O(1) per turn, earlier entries are never rewritten
+        with open(HISTORY_FILE, "ab") as f:
+            f.write(b"".join(json_dumps(entry) + b"\n" for entry in entries))
+        self._file_entries += len(entries)
+        if self._file_entries > COMPACT_HISTORY_AT:
+            self._compact_history(self._parse_history(HISTORY_FILE.read_bytes()))
         self.log("HISTORY", "History saved.", "ok")
 
     def get_calendar_context(self):
@@ -202,23 +409,19 @@ When creating specialty cocktails for events, you MUST follow these rules:
             return ""
 
         lines = ["\n--- UPCOMING GOOGLE CALENDAR EVENTS (Next 7 Days) ---"]
-        # Group by date for readability
+        # Group by date for readability; date_str is formatted at sync time
         prev_date = None
-        included = 0
         for event in self.calendar_events:
-            try:
-                event_date = event['sort_key'].strftime("%A, %B %d")
-            except Exception:
-                event_date = "Unknown date"
+            event_date = event.get('date_str', "Unknown date")
             if event_date != prev_date:
                 lines.append(f"\n  {event_date}:")
                 prev_date = event_date
             lines.append(f"    - {event['detail']} : {event['title']} [{event['source']}]")
-            included += 1
 
         lines.append("--- END CALENDAR ---\n")
         context = "\n".join(lines)
-        self.log("CALENDAR", f"Calendar context built — {included} events, {len(context)} chars", "info")
+        if self._log_enabled:
+            self.log("CALENDAR", f"Calendar context built — {len(self.calendar_events)} events, {len(context)} chars", "info")
         return context
 
     def get_history_context(self):
@@ -233,112 +436,202 @@ When creating specialty cocktails for events, you MUST follow these rules:
             self.log("HISTORY", "No history to include in context.", "info")
             return ""
 
-        context = "\n\n--- PAST CONVERSATION HISTORY ---\n"
         # Limit context to last 10 interactions to avoid token limits if history grows large
         recent_history = self.history[-10:]
-        self.log("HISTORY", f"Including last {len(recent_history)} entries as context.", "info")
-        for entry in recent_history:
-            role = "User (Owner)" if entry['role'] == 'user' else "AI (Planner)"
-            context += f"{role}: {entry['content']}\n"
-        context += "--- END HISTORY ---\n\n"
-        return context
+        if self._log_enabled:
+            self.log("HISTORY", f"Including last {len(recent_history)} entries as context.", "info")
+        body = "".join(
+            f"{'User (Owner)' if entry['role'] == 'user' else 'AI (Planner)'}: {entry['content']}\n"
+            for entry in recent_history
+        )
+        return f"\n\n--- PAST CONVERSATION HISTORY ---\n{body}--- END HISTORY ---\n\n"
 
     def generate_seasonal_plan(self):
+        return self._call_model(*self._build_seasonal_prompt(), "Error generating seasonal plan")
+
+    def generate_seasonal_plan_stream(self):
+        """Streaming variant of generate_seasonal_plan — yields text chunks."""
+        return self._stream_model(*self._build_seasonal_prompt(), "Error generating seasonal plan")
+
+    def _build_seasonal_prompt(self):
+        """Return (head, tail) of the seasonal prompt; see _static_prefix()."""
         self.log("PARTY", "Generating initial seasonal plan...", "info")
         current_date = datetime.datetime.now().strftime("%B %d, %Y")
 
         history_context = self.get_history_context()
         calendar_context = self.get_calendar_context()
-        cocktail_context = self._get_cocktail_pricing_context()
-
-        prompt = f"""
-Current Date: {current_date}
 
-You are the owner and creative director of Patterson Park Patio Bar in Houston, Texas.
-We need a forward-looking seasonal strategy.
+        # Static role/inventory/instructions first, per-request context last,
+        # so the leading tokens stay identical across calls (prefix caching).
+        tail = "".join((
+            _SEASONAL_PROMPT_BODY, history_context, "\n", calendar_context,
+            "\nCurrent Date: ", current_date, "\n",
+        ))
 
-{history_context}
-{calendar_context}
-{cocktail_context}
+        if self._log_enabled:
+            self.log("GEMINI", f"Prompt built — {self._prompt_len(_SEASONAL_PROMPT_HEAD, tail)} chars (including history context)", "info")
+        return _SEASONAL_PROMPT_HEAD, tail
 
-IMPORTANT: Review the Google Calendar events above carefully. These are REAL scheduled events,
-bookings, and commitments already on our calendar. Your seasonal plan MUST:
-- Work around any existing bookings or reservations shown in the calendar.
-- Build on or enhance any events already scheduled (don't conflict with them).
-- Reference specific calendar items when relevant (e.g., "Since we already have [X] booked on [date]...").
-- Identify open dates that are good opportunities for new events.
+    def refine_plan(self, current_plan, user_feedback):
+        return self._call_model(*self._build_refine_prompt(current_plan, user_feedback), "Error refining plan")
 
-Please also research upcoming seasonal events, holidays, festivals, and major sporting events relevant to Houston and our demographic (23-39 year olds).
+    def refine_plan_stream(self, current_plan, user_feedback):
+        """Streaming variant of refine_plan — yields text chunks."""
+        return self._stream_model(*self._build_refine_prompt(current_plan, user_feedback), "Error refining plan")
 
-Create a **Seasonal Theme Plan** covering the next 3 months.
-For EACH month, provide:
-1. **Theme Name:** Catchy title.
-2. **Key Event:** One major event to throw a party for (e.g., Super Bowl, St. Patrick's, Mardi Gras, First Day of Spring).
-3. **Decorations:** Specific, actionable decor ideas.
-4. **Music Vibe:** Genres or specific artists.
-5. **Seasonal Cocktails:** Follow the COCKTAIL PRICING RULES above exactly. Use ONLY liquors from the inventory list provided (with their real costs per ounce). For each event, create the appropriate number of specialty cocktails with full recipes, itemized ingredient costs, total COGS, and a menu price between $10-$14 targeting 15% cost of goods. Use mid-tier liquors (a step above well) as the base spirits.
-6. **Weekly events** or promotions to keep the momentum going. Focus on the latest streaming entertainment or social media trends. Be creative!
+    def _build_refine_prompt(self, current_plan, user_feedback):
+        """Return (head, tail) of the refine prompt; see _static_prefix()."""
+        self.log("PARTY", "Refining plan with user feedback...", "info")
+        if self._log_enabled:
+            self.log("PARTY", f"Current plan size: {len(current_plan)} chars", "info")
+            self.log("PARTY", f"User feedback: {user_feedback[:120]}{'...' if len(user_feedback) > 120 else ''}", "info")
 
-Also, list any other smaller opportunities (holidays, festivals) we should be aware of.
-Flag any scheduling conflicts with existing calendar events.
-"""
+        history_context = self.get_history_context()
 
-        self.log("GEMINI", f"Prompt built — {len(prompt)} chars (including history context)", "info")
+        tail = "".join((
+            _REFINE_PROMPT_BODY, history_context,
+            "\nHere is the Current Seasonal Plan you proposed:\n---\n", current_plan,
+            "\n---\n", _FEEDBACK_LEAD, user_feedback, '"\n',
+        ))
+
+        if self._log_enabled:
+            self.log("GEMINI", f"Refine prompt built — {self._prompt_len(_REFINE_PROMPT_HEAD, tail)} chars", "info")
+        return _REFINE_PROMPT_HEAD, tail
+
+    def refine_plan_sections(self, sections, user_feedback):
+        """Patch-style refine: the model returns only the sections it changes.
+
+        sections is the list produced by split_plan_sections(). Returns the
+        updated section list. If the model's patch cannot be parsed, falls back
+        to a full refine_plan() rewrite and re-splits it; raises RuntimeError
+        if that rewrite fails too, since its ErrorReply has no sections.
+        """
+        if self._log_enabled:
+            self.log("PARTY", f"Refining {len(sections)} plan sections with user feedback...", "info")
+        history_context = self.get_history_context()
+        listing = "\n\n".join(
+            f"[{sec['id']}] {sec['title'] or '(untitled)'}\n{sec['body']}" for sec in sections
+        )
+
+        tail = "".join((
+            _PATCH_PROMPT_BODY, history_context,
+            "\n--- CURRENT PLAN SECTIONS ---\n", listing, "\n--- END PLAN ---\n", _FEEDBACK_LEAD,
+            user_feedback, '"\n',
+        ))
+        if self._log_enabled:
+            self.log("GEMINI", f"Patch prompt built — {self._prompt_len(_REFINE_PROMPT_HEAD, tail)} chars", "info")
         self.log("GEMINI", "Sending to model='gemini-pro-latest'...", "info")
-
+        contents, config = self._request(_REFINE_PROMPT_HEAD, tail, response_mime_type="application/json")
         try:
             response = self.client.models.generate_content(
                 model='gemini-pro-latest',
-                contents=prompt
+                contents=contents,
+                config=config,
             )
-            self.log("GEMINI", f"Response received — {len(response.text)} chars", "ok")
-            return response.text
+            patch = json_loads(response.text)
+            updated = apply_plan_patch(sections, patch)
+            self.log("GEMINI", (
+                f"Patch applied — {len(patch.get('replace', []))} replaced, "
+                f"{len(patch.get('add', []))} added, {len(patch.get('remove', []))} removed"
+            ), "ok")
+            return updated
+        except Exception as e:
+            self.log("GEMINI", f"Patch refine failed ({e}) — falling back to full rewrite", "warn")
+        result = self.refine_plan(join_plan_sections(sections), user_feedback)
+        if isinstance(result, ErrorReply):
+            raise RuntimeError(result)
+        return split_plan_sections(result)
+
+    # ------------------------------------------------------------------
+    # Prompt cache (static role + inventory prefix held server-side)
+    # ------------------------------------------------------------------
+    def _static_prefix(self, head):
+        """The cacheable start of a prompt: its role line(s) + the pricing block."""
+        return head + self._get_cocktail_pricing_context()
+
+    def _prompt_len(self, head, tail):
+        return len(head) + len(self._get_cocktail_pricing_context()) + len(tail)
+
+    def create_prompt_cache(self, ttl_seconds=PROMPT_CACHE_TTL_SECONDS):
+        """Upload the static prefix of the seasonal and refine prompts as Gemini
+        cached contents, or reuse the process-wide copies (see prompt_cache),
+        so later calls only send the per-request tail. Best effort: a prompt
+        whose cache Gemini rejects keeps its full prefix.
+        """
+        for head in (_SEASONAL_PROMPT_HEAD, _REFINE_PROMPT_HEAD):
+            cache = PromptCache(self.client, self._static_prefix(head), ttl_seconds, self.log)
+            if cache.name():
+                self._prompt_caches[head] = cache
+            else:
+                self._prompt_caches.pop(head, None)
+
+    def _request(self, head, tail, **config):
+        """Return (contents, config) for a gemini-pro-latest call: just the tail
+        against the prompt cache when one is live, else the full prompt."""
+        cache = self._prompt_caches.get(head)
+        cached = cache.name() if cache else None
+        if cached:
+            return tail, types.GenerateContentConfig(cached_content=cached, **config)
+        return self._static_prefix(head) + tail, (types.GenerateContentConfig(**config) if config else None)
+
+    # ------------------------------------------------------------------
+    # Model call
+    # ------------------------------------------------------------------
+    def _call_model(self, head, tail, error_prefix):
+        """Blocking call with a hedged fallback; see model_hedge.hedged_generate()."""
+        self.log("GEMINI", "Sending to model='gemini-pro-latest'...", "info")
+        prompt, config = self._request(head, tail)
+        # The prompt cache belongs to the primary model; the fallback needs
+        # the full prompt
+        fallback_prompt = self._static_prefix(head) + tail if config else prompt
+        return hedged_generate(self.client, self.log, prompt, config, fallback_prompt, error_prefix)
+
+    def _stream_model(self, head, tail, error_prefix):
+        """Yield response text chunks from Gemini as they are generated."""
+        self.log("GEMINI", "Streaming from model='gemini-pro-latest'...", "info")
+        received = 0
+        try:
+            prompt, config = self._request(head, tail)
+            stream = self.client.models.generate_content_stream(
+                model='gemini-pro-latest',
+                contents=prompt,
+                config=config,
+            )
+            try:
+                for chunk in stream:
+                    if chunk.text:
+                        received += len(chunk.text)
+                        yield chunk.text
+            finally:
+                # Closed on GeneratorExit as well, when the caller abandons the reply
+                stream.close()
+            self.log("GEMINI", f"Stream complete — {received} chars", "ok")
         except Exception as e:
             self.log("GEMINI", f"Model error: {e}", "err")
-            return f"Error generating seasonal plan: {e}"
-
-    def refine_plan(self, current_plan, user_feedback):
-        self.log("PARTY", "Refining plan with user feedback...", "info")
-        self.log("PARTY", f"Current plan size: {len(current_plan)} chars", "info")
-        self.log("PARTY", f"User feedback: {user_feedback[:120]}{'...' if len(user_feedback) > 120 else ''}", "info")
+            yield ErrorReply(f"{error_prefix}: {e}")
 
-        history_context = self.get_history_context()
-        cocktail_context = self._get_cocktail_pricing_context()
-
-        prompt = f"""
-You are the creative director of Patterson Park Patio Bar.
-{history_context}
-{cocktail_context}
 
-Here is the Current Seasonal Plan you proposed:
----
-{current_plan}
----
+_RULE = "=" * 50
 
-The user (owner) has provided the following feedback:
-"{user_feedback}"
 
-Please UPDATE the plan to incorporate this feedback.
-Keep the structure (Seasonal Theme Plan for next 3 months) but modify the specific sections requested.
-If the feedback implies a total change of direction, feel free to rewrite the relevant parts entirely.
-When creating or modifying cocktails, you MUST follow the COCKTAIL PRICING RULES above — use specific
-ingredients from the inventory with real costs, itemize all ingredient costs, calculate total COGS,
-and set menu prices between $10-$14 targeting 15% cost of goods. Use mid-tier liquors as the base.
-"""
+def _print_banner(title):
+    """Write a section banner with a single stdout write."""
+    sys.stdout.write(f"\n{_RULE}\n{title}\n{_RULE}\n")
 
-        self.log("GEMINI", f"Refine prompt built — {len(prompt)} chars", "info")
-        self.log("GEMINI", "Sending to model='gemini-pro-latest'...", "info")
 
-        try:
-            response = self.client.models.generate_content(
-                model='gemini-pro-latest',
-                contents=prompt
-            )
-            self.log("GEMINI", f"Response received — {len(response.text)} chars", "ok")
-            return response.text
-        except Exception as e:
-            self.log("GEMINI", f"Model error: {e}", "err")
-            return f"Error refining plan: {e}"
+def _print_stream(chunks):
+    """Echo streamed text to the terminal as it arrives; return the full text
+    (an ErrorReply if the stream ended in one)."""
+    parts = []
+    write, flush = sys.stdout.write, sys.stdout.flush
+    for text in chunks:
+        write(text)
+        flush()  # one flush per chunk so the plan appears as it streams
+        parts.append(text)
+    write("\n")
+    flush()
+    text = "".join(parts)
+    return ErrorReply(text) if parts and isinstance(parts[-1], ErrorReply) else text
 
 
 def main():
@@ -349,15 +642,13 @@ def main():
     agent = PartyPlanningAgent(secrets_config.GEMINI_API_KEY)
 
     # Initial Generation
-    plan = agent.generate_seasonal_plan()
-    print("\n" + "=" * 50)
-    print("INITIAL SEASONAL PLAN")
-    print("=" * 50)
-    print(plan)
+    _print_banner("INITIAL SEASONAL PLAN")
+    plan = _print_stream(agent.generate_seasonal_plan_stream())
 
     # Feedback Loop
     while True:
-        print("\n" + "=" * 50)
+        # input() flushes stdout before it prompts
+        sys.stdout.write(f"\n{_RULE}\n")
         feedback = input("Enter your feedback to refine the plan (or type 'exit' to quit): ").strip()
 
         if feedback.lower() in ['exit', 'quit', 'no', 'done']:
@@ -368,16 +659,15 @@ def main():
         if not feedback:
             continue
 
-        plan = agent.refine_plan(plan, feedback)
+        _print_banner("UPDATED SEASONAL PLAN")
+        result = _print_stream(agent.refine_plan_stream(plan, feedback))
+        if isinstance(result, ErrorReply):
+            continue  # keep refining the last good plan
+        plan = result
 
         # Save this interaction to history
         agent.save_interaction(feedback, plan)
 
-        print("\n" + "=" * 50)
-        print("UPDATED SEASONAL PLAN")
-        print("=" * 50)
-        print(plan)
-
 
 if __name__ == "__main__":
     main()
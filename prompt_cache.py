@@ -0,0 +1,100 @@
+"""
+Prompt Cache - process-wide Gemini cached contents for static prompt prefixes.
+==============================================================================
+The Party Planner and Cocktail Creator start every prompt with the same
+role + inventory block. Uploading that block once as a Gemini cached
+content lets later calls send (and prefill) only the per-request tail.
+
+Handles are shared by prefix text: every agent in the process that asks
+for the same prefix (one per GUI switch / web session) reuses the same
+upload. Each prefix has its own lock, so an upload only blocks agents
+waiting on that prefix.
+
+Accepts an optional log_fn(category, message, level) callback for the GUI
+debug console.
+"""
+
+import hashlib
+import threading
+import time
+
+from google.genai import types
+
+PROMPT_CACHE_TTL_SECONDS = 3600
+RENEW_MARGIN_SECONDS = 60  # stop using a handle this early rather than race its expiry
+
+# sha256(prefix) -> _Slot; _SLOTS_LOCK guards the dict only, never an upload
+_SLOTS = {}
+_SLOTS_LOCK = threading.Lock()
+
+
+def _noop_log(category, message, level="info"):
+    """Default no-op logger used when no GUI callback is provided."""
+    pass
+
+
+class _Slot:
+    """Shared state for one prefix: its upload lock and (name, expires_at)."""
+    __slots__ = ("lock", "entry")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entry = None
+
+
+class PromptCache:
+    """One agent's handle on the shared cached content for a prompt prefix.
+
+    Best effort: Gemini rejects caches below its minimum token count or for
+    unsupported models. After a failed upload name() returns None for this
+    handle, and the caller sends the full prompt instead.
+    """
+
+    def __init__(self, client, prefix, ttl_seconds=PROMPT_CACHE_TTL_SECONDS, log_fn=None):
+        self.prefix = prefix
+        self.log = log_fn or _noop_log
+        self._client = client
+        self._ttl = ttl_seconds
+        self._failed = False
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with _SLOTS_LOCK:
+            slot = _SLOTS.get(key)
+            if slot is None:
+                slot = _SLOTS[key] = _Slot()
+        self._slot = slot
+
+    def name(self):
+        """Return the live cached-content name, uploading or renewing it when
+        needed; None if the cache is unavailable."""
+        if self._failed:
+            return None
+        entry = self._slot.entry  # one tuple read: no lock on the hot path
+        if entry is not None and time.time() < entry[1]:
+            return entry[0]
+        return self._refresh()
+
+    def _refresh(self):
+        slot = self._slot
+        with slot.lock:
+            # Another agent may have uploaded while this one waited
+            entry = slot.entry
+            if entry is not None and time.time() < entry[1]:
+                self.log("GEMINI", f"Reusing prompt cache: {entry[0]}", "ok")
+                return entry[0]
+
+            self.log("GEMINI", "Creating prompt cache for role + inventory prefix...", "info")
+            try:
+                cache = self._client.caches.create(
+                    model="gemini-pro-latest",
+                    config=types.CreateCachedContentConfig(
+                        contents=[self.prefix],
+                        ttl=f"{self._ttl}s",
+                    ),
+                )
+            except Exception as e:
+                self._failed = True
+                self.log("GEMINI", f"Prompt cache unavailable ({e}) — sending full prompts.", "warn")
+                return None
+            slot.entry = (cache.name, time.time() + self._ttl - RENEW_MARGIN_SECONDS)
+            self.log("GEMINI", f"Prompt cache ready: {cache.name}", "ok")
+            return cache.name
@@ -0,0 +1,89 @@
+"""
+Response Cache - exact-match cache for agent replies.
+=====================================================
+Short-circuits repeated Gemini calls during the "tweak and resend" workflow:
+when the same agent sees the same user text against the same conversation
+state (current plan / cocktail list / synced data), the previous reply is
+returned instead of making a new billed call.
+
+Entries live in a small in-memory LRU in front of an on-disk SQLite table
+(response_cache.db) and expire after DEFAULT_TTL_SECONDS.
+
+Accepts an optional log_fn(category, message, level) callback for the GUI
+debug console.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_FILE = Path(__file__).parent / "response_cache.db"
+DEFAULT_TTL_SECONDS = 3600
+MAX_MEMORY_ENTRIES = 128
+
+
+def _noop_log(category, message, level="info"):
+    """Default no-op logger used when no GUI callback is provided."""
+    pass
+
+
+class ResponseCache:
+    """Thread-safe (agent, prompt, context) -> response cache."""
+
+    def __init__(self, log_fn=None, cache_path=None, ttl=DEFAULT_TTL_SECONDS):
+        self.log = log_fn or _noop_log
+        self.ttl = ttl
+        self.cache_path = Path(cache_path) if cache_path else CACHE_FILE
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()  # key -> (expires_at, response)
+        self._db = sqlite3.connect(str(self.cache_path), check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self._db.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+        self.log("CACHE", f"Response cache ready. File: {self.cache_path}", "ok")
+
+    @staticmethod
+    def make_key(agent, user_text, state=""):
+        """Key on the agent plus hashes of the user text and the context it applies to."""
+        text_hash = hashlib.sha256(user_text.encode("utf-8")).hexdigest()
+        state_hash = hashlib.sha256(state.encode("utf-8")).hexdigest()
+        return f"{agent}|{text_hash}|{state_hash}"
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing/expired."""
+        now = time.time()
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None:
+                if hit[0] >= now:
+                    self._lru.move_to_end(key)
+                    return hit[1]
+                del self._lru[key]
+
+            row = self._db.execute(
+                "SELECT response, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                return None
+            self._remember(key, row[1], row[0])
+            return row[0]
+
+    def set(self, key, response):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires, response)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires) VALUES (?, ?, ?)",
+                (key, response, expires),
+            )
+
+    def _remember(self, key, expires, response):
+        self._lru[key] = (expires, response)
+        self._lru.move_to_end(key)
+        while len(self._lru) > MAX_MEMORY_ENTRIES:
+            self._lru.popitem(last=False)